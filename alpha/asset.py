@@ -8,7 +8,7 @@ Date:   2019/02/16
 Email:  huangtao@ifclover.com
 """
 
-import json
+from alpha.utils import codec
 
 
 class Asset:
@@ -20,8 +20,12 @@ class Asset:
         assets: Asset information, e.g. {"BTC": {"free": "1.1", "locked": "2.2", "total": "3.3"}, ... }
         timestamp: Published time, millisecond.
         update: If any update? True or False.
+
+    * NOTE: Asset objects published to callbacks are shared, do not modify them or their `assets` dict.
     """
 
+    __slots__ = ("platform", "account", "assets", "timestamp", "update")
+
     def __init__(self, platform=None, account=None, assets=None, timestamp=None, update=False):
         """ Initialize. """
         self.platform = platform
@@ -42,7 +46,7 @@ class Asset:
         return d
 
     def __str__(self):
-        info = json.dumps(self.data)
+        info = codec.dumps(self.data)
         return info
 
     def __repr__(self):
@@ -21,21 +21,25 @@ class Config:
         3. Some `key` name is upper case are the build-in, and all `key` will be set to lower case:
             SERVER_ID: Server id, every running process has a unique id.
             LOG: Logger print config.
+            JOURNAL: Event journal config, default is {} (disabled).
             PLATFORMS: Trading Exchanges config, default is {}.
             ACCOUNTS: Trading Exchanges config list, default is [].
             MARKETS: Market Server config list, default is {}.
             HEARTBEAT: Server heartbeat config, default is {}.
             PROXY: HTTP proxy config, default is None.
+            HTTP: HTTP connection pool config, default is {}.
     """
 
     def __init__(self):
         self.server_id = None
         self.log = {}
+        self.journal = {}
         self.platforms = {}
         self.accounts = []
         self.markets = {}
         self.heartbeat = {}
         self.proxy = None
+        self.http = {}
         self.config_file = None
 
     def loads(self, config_file=None):
@@ -67,11 +71,13 @@ class Config:
         """
         self.server_id = update_fields.get("SERVER_ID", tools.get_uuid1())
         self.log = update_fields.get("LOG", {})
+        self.journal = update_fields.get("JOURNAL", {})
         self.platforms = update_fields.get("PLATFORMS", {})
         self.accounts = update_fields.get("ACCOUNTS", [])
         self.markets = update_fields.get("MARKETS", [])
         self.heartbeat = update_fields.get("HEARTBEAT", {})
         self.proxy = update_fields.get("PROXY", None)
+        self.http = update_fields.get("HTTP", {})
 
         for k, v in update_fields.items():
             setattr(self, k, v)
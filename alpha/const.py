@@ -26,3 +26,12 @@ MARKET_TYPE_KLINE = "kline"
 
 # REQUEST AGENT 
 USER_AGENT = "AlphaQuant" + VERSION
+
+# Websocket Dispatch Queue Overflow Policies
+WS_OVERFLOW_BLOCK = "block"  # stop reading from the socket until the consumer catches up
+WS_OVERFLOW_DROP_OLDEST = "drop_oldest"  # discard the oldest pending message that has a channel key
+WS_OVERFLOW_CONFLATE = "conflate"  # keep only the latest pending message per channel
+
+# Orderbook Subscription Types
+ORDERBOOK_TYPE_SNAPSHOT = "snapshot"  # full depth snapshot on every push, e.g. `depth.step6`
+ORDERBOOK_TYPE_INCREMENTAL = "incremental"  # incremental depth maintained locally, e.g. `depth.size_20.high_freq`
@@ -7,10 +7,12 @@ Author: QiaoXiaofeng
 Date:   2020/12/1
 Email: andyjoe318@gmail.com
 History: 1.first version.
+         2.replace 5ms polling with a deadline-ordered timer heap.
 """
 
+import time
+import heapq
 import asyncio
-import json
 
 from alpha.utils import tools
 from alpha.utils import logger
@@ -21,42 +23,57 @@ __all__ = ("heartbeat")
 
 class HeartBeat(object):
     """ 心跳
+
+    * NOTE: 任务按下一次执行时间保存在最小堆中，事件循环只在最近一个任务到期时才被唤醒；
+            下一次执行时间由上一次的计划时间累加得到，避免回调耗时带来的时间漂移。
     """
 
     def __init__(self):
-        self._count = 0  # 心跳次数
-        self._interval = 0.005  # 服务心跳执行时间间隔(秒)
+        self._count = 0  # 心跳次数(调度器被唤醒的次数)
         self._print_interval = config.heartbeat.get("interval", 60)  # 心跳打印时间间隔(秒)，0为不打印
         self._tasks = {}  # 跟随心跳执行的回调任务列表，由 self.register 注册 {task_id: {...}}
+        self._heap = []  # 任务执行时间最小堆 [(deadline, seq, task_id), ...]
+        self._seq = 0  # 堆元素序号，保证相同执行时间的任务按注册顺序执行
+        self._started = False  # 调度器是否已经启动
+        self._handle = None  # 下一次唤醒的 TimerHandle
+        self._wakeup_at = None  # 下一次唤醒的时间(time.monotonic)
+        self._next_print = None  # 下一次打印心跳的时间(time.monotonic)
 
     @property
     def count(self):
         return self._count
 
     def ticker(self):
-        """ 启动心跳， 每interval间隔执行一次
+        """ 启动心跳，执行所有到期的任务并设置下一次唤醒时间
         """
+        now = time.monotonic()
+        if not self._started:
+            self._started = True
+            if self._print_interval > 0:
+                self._next_print = now + self._print_interval
+        self._handle = None
+        self._wakeup_at = None
         self._count += 1
 
         # 打印心跳次数
-        if self._print_interval > 0:
-            if self._count % int(self._print_interval*200) == 0:
-                logger.info("do server heartbeat, count:", self._count, caller=self)
-
-        # 设置下一次心跳回调
-        asyncio.get_event_loop().call_later(self._interval, self.ticker)
+        if self._next_print is not None and now >= self._next_print:
+            logger.info("do server heartbeat, count:", self._count, caller=self)
+            self._next_print = self._advance(self._next_print, self._print_interval, now)
 
         # 执行任务回调
-        for task_id, task in self._tasks.items():
-            interval = task["interval"]
-            if self._count % int(interval*200) != 0:
+        while self._heap and self._heap[0][0] <= now:
+            deadline, seq, task_id = heapq.heappop(self._heap)
+            task = self._tasks.get(task_id)
+            if not task or task["seq"] != seq:
                 continue
-            func = task["func"]
-            args = task["args"]
-            kwargs = task["kwargs"]
+            self._push(task_id, self._advance(deadline, task["interval"], now))
+            kwargs = dict(task["kwargs"])
             kwargs["task_id"] = task_id
             kwargs["heart_beat_count"] = self._count
-            asyncio.get_event_loop().create_task(func(*args, **kwargs))
+            asyncio.get_event_loop().create_task(task["func"](*task["args"], **kwargs))
+
+        # 设置下一次心跳回调
+        self._schedule()
 
     def register(self, func, interval=1, *args, **kwargs):
         """ 注册一个任务，在每次心跳的时候执行调用
@@ -68,10 +85,14 @@ class HeartBeat(object):
             "func": func,
             "interval": interval,
             "args": args,
-            "kwargs": kwargs
+            "kwargs": kwargs,
+            "seq": None
         }
         task_id = tools.get_uuid1()
         self._tasks[task_id] = t
+        self._push(task_id, time.monotonic() + interval)
+        if self._started:
+            self._schedule()
         return task_id
 
     def unregister(self, task_id):
@@ -81,4 +102,42 @@ class HeartBeat(object):
         if task_id in self._tasks:
             self._tasks.pop(task_id)
 
+    def _push(self, task_id, deadline):
+        """ 将任务的下一次执行时间压入堆
+        """
+        self._seq += 1
+        self._tasks[task_id]["seq"] = self._seq
+        heapq.heappush(self._heap, (deadline, self._seq, task_id))
+
+    def _advance(self, deadline, interval, now):
+        """ 按固定间隔推进计划时间，如果已经错过多个周期，跳到 now 之后的第一个周期
+        """
+        deadline += interval
+        if deadline <= now:
+            deadline += ((now - deadline) // interval + 1) * interval
+        return deadline
+
+    def _schedule(self):
+        """ 根据最近一个到期时间设置唤醒回调
+        """
+        while self._heap:
+            _, seq, task_id = self._heap[0]
+            task = self._tasks.get(task_id)
+            if task and task["seq"] == seq:
+                break
+            heapq.heappop(self._heap)  # 丢弃已注销的任务
+        wakeup_at = self._heap[0][0] if self._heap else None
+        if self._next_print is not None and (wakeup_at is None or self._next_print < wakeup_at):
+            wakeup_at = self._next_print
+        if wakeup_at is None:
+            return
+        if self._handle and self._wakeup_at <= wakeup_at:
+            return
+        if self._handle:
+            self._handle.cancel()
+        self._wakeup_at = wakeup_at
+        delay = max(wakeup_at - time.monotonic(), 0)
+        self._handle = asyncio.get_event_loop().call_later(delay, self.ticker)
+
+
 heartbeat = HeartBeat()
@@ -8,10 +8,10 @@ Date:   2020/1/10
 Email:  andyjoe318@gmail.com
 """
 
-import json
 
 from alpha import const
 from alpha.utils import logger
+from alpha.utils import codec
 
 
 class Orderbook:
@@ -25,6 +25,8 @@ class Orderbook:
         timestamp: Update time, millisecond.
     """
 
+    __slots__ = ("platform", "symbol", "asks", "bids", "timestamp")
+
     def __init__(self, platform=None, symbol=None, asks=None, bids=None, timestamp=None):
         """ Initialize. """
         self.platform = platform
@@ -45,7 +47,7 @@ class Orderbook:
         return d
 
     def __str__(self):
-        info = json.dumps(self.data)
+        info = codec.dumps(self.data)
         return info
 
     def __repr__(self):
@@ -64,6 +66,8 @@ class Trade:
         timestamp: Update time, millisecond.
     """
 
+    __slots__ = ("platform", "symbol", "action", "price", "quantity", "timestamp")
+
     def __init__(self, platform=None, symbol=None, action=None, price=None, quantity=None, timestamp=None):
         """ Initialize. """
         self.platform = platform
@@ -86,7 +90,7 @@ class Trade:
         return d
 
     def __str__(self):
-        info = json.dumps(self.data)
+        info = codec.dumps(self.data)
         return info
 
     def __repr__(self):
@@ -108,6 +112,8 @@ class Kline:
         kline_type: Kline type name, kline - 1min, kline_5min - 5min, kline_15min - 15min.
     """
 
+    __slots__ = ("platform", "symbol", "open", "high", "low", "close", "volume", "timestamp", "kline_type")
+
     def __init__(self, platform=None, symbol=None, open=None, high=None, low=None, close=None, volume=None,
                  timestamp=None, kline_type=None):
         """ Initialize. """
@@ -137,7 +143,7 @@ class Kline:
         return d
 
     def __str__(self):
-        info = json.dumps(self.data)
+        info = codec.dumps(self.data)
         return info
 
     def __repr__(self):
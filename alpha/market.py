@@ -26,6 +26,7 @@ class Market:
         symbols: Symbol name for your trade. e.g. [`BTC-USD`]
         channels: sub channels.e.g.['kline', 'orderbook', 'trade']
         orderbook_length: max orderbook length.default 10.
+        orderbooks_length: max orderbooks history length, default 100, same for `klines_length` and `trades_length`.
         wss: Websocket address.
         orderbook_update_callback: You can use this param to specific a async callback function when you initializing Market
             object. `orderbook_update_callback` is like `async def on_orderbook_update_callback(orderbook: Orderbook): pass` and this
@@ -36,6 +37,18 @@ class Market:
         trade_update_callback: You can use this param to specific a async callback function when you initializing
             Market object. `trade_update_callback` is like `async def on_trade_update_callback(trade: Trade): pass`
             and this callback function will be executed asynchronous when trade updated.
+        kwargs:
+            orderbook_type: `snapshot` (default) or `incremental`, maintain a local orderbook from the incremental
+                depth channel with version checking and automatic resync (contract markets only).
+            orderbook_depth: Depth of the incremental depth channel, 20 or 150, default is 20.
+            queue_size: Length of the websocket message queue, default is 0 (process messages inline).
+            overflow_policy: What to do when the message queue is full, `block`, `drop_oldest` or `conflate`
+                (keep only the latest pending message per channel). Pings, trades and incremental depth updates are
+                never conflated or dropped.
+            conflate_channels: Channel list whose callbacks only receive the latest update per symbol, while the
+                previous callback is still running, e.g. ["orderbook", "kline"].
+            decompress_offload_size: Frames not smaller than this size (bytes) are decompressed in the default
+                thread pool instead of the event loop, default is 0 (never offload).
     """
 
     def __init__(self, platform=None, symbols=None, channels=None, orderbook_length=None, orderbooks_length=None,\
@@ -74,12 +87,45 @@ class Market:
 
     @property
     def orderbooks(self):
+        """ Read-only view of the latest orderbooks, see `alpha.utils.ringbuffer.RingBufferView`.
+        e.g. `market.orderbooks.latest`, `market.orderbooks.last(10)`, `market.orderbooks.since(ts)`.
+        """
         return self._m.orderbooks
 
     @property
     def klines(self):
+        """ Read-only view of the latest klines. """
         return self._m.klines
 
     @property
     def trades(self):
-        return self._m.trades
\ No newline at end of file
+        """ Read-only view of the latest trades. """
+        return self._m.trades
+
+    def orderbooks_for(self, symbol):
+        """ Read-only view of the latest orderbooks of a symbol, e.g. `market.orderbooks_for("BTC-USD").latest`.
+        """
+        return self._m.orderbooks_for(symbol)
+
+    def klines_for(self, symbol):
+        """ Read-only view of the latest klines of a symbol. """
+        return self._m.klines_for(symbol)
+
+    def trades_for(self, symbol):
+        """ Read-only view of the latest trades of a symbol. """
+        return self._m.trades_for(symbol)
+
+    def register_channel_type(self, channel_type, channel, handler):
+        """ Register a new channel type, e.g. `register_channel_type("bbo", "market.{s}.bbo", handler)`,
+        `handler` is like `async def handler(symbol, data): pass`. Register before the websocket is connected.
+        """
+        self._m.register_channel_type(channel_type, channel, handler)
+
+    @property
+    def conflate_stats(self):
+        return self._m.conflate_stats
+
+    @property
+    def decompress_stats(self):
+        """ Decompression time per channel, {channel: {"count", "bytes", "total_ms", "max_ms"}}. """
+        return self._m.decompress_stats
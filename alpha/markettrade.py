@@ -8,10 +8,10 @@ Date:   2020/1/10
 Email:  andyjoe318@gmail.com
 """
 
-import json
 
 from alpha import const
 from alpha.utils import logger
+from alpha.utils import codec
 
 class Trade:
     """ Trade object.
@@ -25,6 +25,8 @@ class Trade:
         timestamp: Update time, millisecond.
     """
 
+    __slots__ = ("platform", "symbol", "action", "price", "quantity", "timestamp")
+
     def __init__(self, platform=None, symbol=None, action=None, price=None, quantity=None, timestamp=None):
         """ Initialize. """
         self.platform = platform
@@ -47,7 +49,7 @@ class Trade:
         return d
 
     def __str__(self):
-        info = json.dumps(self.data)
+        info = codec.dumps(self.data)
         return info
 
     def __repr__(self):
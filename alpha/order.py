@@ -60,8 +60,13 @@ class Order:
         trade_type: Trade type, only for future order.
         ctime: Order create time, millisecond.
         utime: Order update time, millisecond.
+
+    * NOTE: Order objects published to callbacks are shared, do not modify them, use `replace` to get an updated one.
     """
 
+    __slots__ = ("platform", "account", "strategy", "order_no", "action", "order_type", "symbol", "price", "quantity",
+                 "remain", "status", "avg_price", "trade_type", "ctime", "utime")
+
     def __init__(self, account=None, platform=None, strategy=None, order_no=None, symbol=None, action=None, price=0,
                  quantity=0, remain=0, status=ORDER_STATUS_NONE, avg_price=0, order_type=ORDER_TYPE_LIMIT,
                  trade_type=TRADE_TYPE_NONE, ctime=None, utime=None):
@@ -81,6 +86,15 @@ class Order:
         self.ctime = ctime if ctime else tools.get_cur_timestamp_ms()
         self.utime = utime if utime else tools.get_cur_timestamp_ms()
 
+    def replace(self, **kwargs):
+        """ Return a new Order object with some fields replaced, this object is not modified. """
+        obj = Order.__new__(Order)
+        for name in self.__slots__:
+            setattr(obj, name, kwargs.pop(name) if name in kwargs else getattr(self, name))
+        if kwargs:
+            raise TypeError("Order.replace() got unexpected fields: {}".format(", ".join(sorted(kwargs))))
+        return obj
+
     def __str__(self):
         info = "[platform: {platform}, account: {account}, strategy: {strategy}, order_no: {order_no}, " \
                "action: {action}, symbol: {symbol}, price: {price}, quantity: {quantity}, remain: {remain}, " \
@@ -8,10 +8,12 @@ Date:   2020/1/10
 Email:  andyjoe318@gmail.com
 """
 
-import json
+import heapq
+from array import array
 
 from alpha import const
 from alpha.utils import logger
+from alpha.utils import codec
 
 
 class Orderbook:
@@ -23,15 +25,218 @@ class Orderbook:
         asks: Asks list, e.g. [[price, quantity], [...], ...]
         bids: Bids list, e.g. [[price, quantity], [...], ...]
         timestamp: Update time, millisecond.
+
+    * NOTE: An orderbook created by `Orderbook.from_levels` keeps prices and quantities in float arrays
+            (`ask_prices`, `ask_quantities`, `bid_prices`, `bid_quantities`), the string lists `asks` / `bids` are
+            only formatted when they are accessed.
+    * NOTE: Top of book analytics (best prices, mid, spread, microprice, depth and imbalance) are computed from the
+            numeric levels once per orderbook and cached, an orderbook should not be modified after it is published.
     """
 
+    __slots__ = ("platform", "symbol", "timestamp", "_asks", "_bids", "_ask_prices", "_ask_quantities", "_bid_prices",
+                 "_bid_quantities", "_cache")
+
     def __init__(self, platform=None, symbol=None, asks=None, bids=None, timestamp=None):
         """ Initialize. """
         self.platform = platform
         self.symbol = symbol
-        self.asks = asks
-        self.bids = bids
         self.timestamp = timestamp
+        self._asks = asks
+        self._bids = bids
+        self._ask_prices = None
+        self._ask_quantities = None
+        self._bid_prices = None
+        self._bid_quantities = None
+        self._cache = {}  # Memoized analytics, {key: value}.
+
+    @classmethod
+    def from_levels(cls, platform, symbol, asks, bids, timestamp=None):
+        """ Create an orderbook from numeric levels.
+
+        Args:
+            platform: Exchange platform name, e.g. huobi_swap.
+            symbol: Trade pair name, e.g. BTC-USD.
+            asks: Asks list, e.g. [[price, quantity], [...], ...], price and quantity are numbers.
+            bids: Bids list, e.g. [[price, quantity], [...], ...], price and quantity are numbers.
+            timestamp: Update time, millisecond.
+        """
+        orderbook = cls(platform, symbol, timestamp=timestamp)
+        orderbook._ask_prices = array("d", [item[0] for item in asks])
+        orderbook._ask_quantities = array("d", [item[1] for item in asks])
+        orderbook._bid_prices = array("d", [item[0] for item in bids])
+        orderbook._bid_quantities = array("d", [item[1] for item in bids])
+        return orderbook
+
+    @property
+    def asks(self):
+        if self._asks is None and self._ask_prices is not None:
+            self._asks = _format_levels(self._ask_prices, self._ask_quantities)
+        return self._asks
+
+    @asks.setter
+    def asks(self, asks):
+        self._asks = asks
+        self._ask_prices = self._ask_quantities = None
+        self._cache = {}
+
+    @property
+    def bids(self):
+        if self._bids is None and self._bid_prices is not None:
+            self._bids = _format_levels(self._bid_prices, self._bid_quantities)
+        return self._bids
+
+    @bids.setter
+    def bids(self, bids):
+        self._bids = bids
+        self._bid_prices = self._bid_quantities = None
+        self._cache = {}
+
+    @property
+    def ask_prices(self):
+        if self._ask_prices is None:
+            self._ask_prices, self._ask_quantities = _parse_levels(self._asks)
+        return self._ask_prices
+
+    @property
+    def ask_quantities(self):
+        if self._ask_quantities is None:
+            self._ask_prices, self._ask_quantities = _parse_levels(self._asks)
+        return self._ask_quantities
+
+    @property
+    def bid_prices(self):
+        if self._bid_prices is None:
+            self._bid_prices, self._bid_quantities = _parse_levels(self._bids)
+        return self._bid_prices
+
+    @property
+    def bid_quantities(self):
+        if self._bid_quantities is None:
+            self._bid_prices, self._bid_quantities = _parse_levels(self._bids)
+        return self._bid_quantities
+
+    @property
+    def best_ask_price(self):
+        """ Ask 1 price, None if there is no ask. """
+        prices = self.ask_prices
+        return prices[0] if prices else None
+
+    @property
+    def best_ask_quantity(self):
+        """ Ask 1 quantity, None if there is no ask. """
+        quantities = self.ask_quantities
+        return quantities[0] if quantities else None
+
+    @property
+    def best_bid_price(self):
+        """ Bid 1 price, None if there is no bid. """
+        prices = self.bid_prices
+        return prices[0] if prices else None
+
+    @property
+    def best_bid_quantity(self):
+        """ Bid 1 quantity, None if there is no bid. """
+        quantities = self.bid_quantities
+        return quantities[0] if quantities else None
+
+    @property
+    def mid_price(self):
+        """ (ask1 + bid1) / 2, None if any side is empty. """
+        if "mid_price" not in self._cache:
+            ask, bid = self.best_ask_price, self.best_bid_price
+            self._cache["mid_price"] = None if ask is None or bid is None else (ask + bid) / 2
+        return self._cache["mid_price"]
+
+    @property
+    def spread(self):
+        """ ask1 - bid1, None if any side is empty. """
+        if "spread" not in self._cache:
+            ask, bid = self.best_ask_price, self.best_bid_price
+            self._cache["spread"] = None if ask is None or bid is None else ask - bid
+        return self._cache["spread"]
+
+    @property
+    def microprice(self):
+        """ Size weighted mid price, (ask1 * bid1_quantity + bid1 * ask1_quantity) / (ask1_quantity + bid1_quantity).
+        """
+        if "microprice" not in self._cache:
+            ask, bid = self.best_ask_price, self.best_bid_price
+            if ask is None or bid is None:
+                value = None
+            else:
+                ask_qty, bid_qty = self.best_ask_quantity, self.best_bid_quantity
+                total = ask_qty + bid_qty
+                value = (ask * bid_qty + bid * ask_qty) / total if total > 0 else (ask + bid) / 2
+            self._cache["microprice"] = value
+        return self._cache["microprice"]
+
+    def imbalance(self, levels=1):
+        """ Quantity imbalance of the top levels, (bid_quantity - ask_quantity) / (bid_quantity + ask_quantity).
+
+        Args:
+            levels: How many levels of each side to be counted, default is 1.
+
+        Returns:
+            imbalance: Value in [-1, 1], positive means more bids, None if both sides are empty.
+        """
+        key = ("imbalance", levels)
+        if key not in self._cache:
+            ask_qty = sum(self.ask_quantities[:levels])
+            bid_qty = sum(self.bid_quantities[:levels])
+            total = ask_qty + bid_qty
+            self._cache[key] = (bid_qty - ask_qty) / total if total > 0 else None
+        return self._cache[key]
+
+    def depth_to_price(self, side, price):
+        """ Cumulative quantity from the best price up to (and including) a price.
+
+        Args:
+            side: `asks` or `bids`.
+            price: Limit price.
+
+        Returns:
+            quantity: Total quantity of the levels that are not worse than `price`.
+        """
+        key = ("depth_to_price", side, price)
+        if key not in self._cache:
+            prices, quantities = self._side(side)
+            quantity = 0.0
+            for p, q in zip(prices, quantities):
+                if (side == "asks" and p > price) or (side == "bids" and p < price):
+                    break
+                quantity += q
+            self._cache[key] = quantity
+        return self._cache[key]
+
+    def price_for_size(self, side, size):
+        """ The worst price needed to fill a size by sweeping the book from the best price.
+
+        Args:
+            side: `asks` (to buy) or `bids` (to sell).
+            size: Quantity to be filled.
+
+        Returns:
+            price: Worst level price touched, None if the book is not deep enough.
+        """
+        key = ("price_for_size", side, size)
+        if key not in self._cache:
+            prices, quantities = self._side(side)
+            price = None
+            quantity = 0.0
+            for p, q in zip(prices, quantities):
+                quantity += q
+                if quantity >= size:
+                    price = p
+                    break
+            self._cache[key] = price
+        return self._cache[key]
+
+    def _side(self, side):
+        if side == "asks":
+            return self.ask_prices, self.ask_quantities
+        elif side == "bids":
+            return self.bid_prices, self.bid_quantities
+        raise ValueError("side error! side: {}".format(side))
 
     @property
     def data(self):
@@ -45,8 +250,106 @@ class Orderbook:
         return d
 
     def __str__(self):
-        info = json.dumps(self.data)
+        info = codec.dumps(self.data)
         return info
 
     def __repr__(self):
-        return str(self)
\ No newline at end of file
+        return str(self)
+
+
+def _format_levels(prices, quantities):
+    """ Format numeric levels to [["%.8f" % price, "%.8f" % quantity], ...]. """
+    return [["%.8f" % p, "%.8f" % q] for p, q in zip(prices, quantities)]
+
+
+def _parse_levels(levels):
+    """ Parse [[price, quantity], ...] to float arrays. """
+    levels = levels or []
+    return array("d", [float(item[0]) for item in levels]), array("d", [float(item[1]) for item in levels])
+
+
+class LocalOrderbook:
+    """ Local orderbook maintained from incremental depth messages.
+
+    Args:
+        platform: Exchange platform name, e.g. huobi_swap.
+        symbol: Trade pair name, e.g. BTC-USD.
+
+    * NOTE: A `snapshot` event resets the book, every `update` event must carry version = last version + 1. When a
+            gap is detected the book is invalidated and ignores updates until the next snapshot arrives.
+    """
+
+    __slots__ = ("platform", "symbol", "version", "timestamp", "_asks", "_bids")
+
+    def __init__(self, platform=None, symbol=None):
+        """ Initialize. """
+        self.platform = platform
+        self.symbol = symbol
+        self.version = None  # Last applied version, None if the book needs a snapshot.
+        self.timestamp = None
+        self._asks = {}  # {price: quantity}
+        self._bids = {}  # {price: quantity}
+
+    @property
+    def synced(self):
+        return self.version is not None
+
+    def reset(self):
+        """ Invalidate the book, updates will be ignored until a new snapshot arrives. """
+        self.version = None
+        self._asks.clear()
+        self._bids.clear()
+
+    def apply(self, tick, timestamp=None):
+        """ Apply a depth message.
+
+        Args:
+            tick: Depth message, e.g. {"event": "update", "version": 2, "asks": [[price, quantity]], "bids": [...]}
+            timestamp: Update time, millisecond.
+
+        Returns:
+            True if applied or ignored while waiting for a snapshot, False if a version gap is detected.
+        """
+        event = tick.get("event")
+        version = tick.get("version")
+        if event == "snapshot":
+            self._asks.clear()
+            self._bids.clear()
+        elif self.version is None:
+            return True
+        elif version != self.version + 1:
+            self.reset()
+            return False
+        for price, quantity in tick.get("asks") or []:
+            if quantity:
+                self._asks[price] = quantity
+            else:
+                self._asks.pop(price, None)
+        for price, quantity in tick.get("bids") or []:
+            if quantity:
+                self._bids[price] = quantity
+            else:
+                self._bids.pop(price, None)
+        self.version = version
+        self.timestamp = timestamp
+        return True
+
+    def levels(self, length=None):
+        """ Get the sorted top levels.
+
+        Args:
+            length: Max levels of each side, default is all levels.
+
+        Returns:
+            asks: [[price, quantity], ...] in ascending price order.
+            bids: [[price, quantity], ...] in descending price order.
+        """
+        if length:
+            ask_prices = heapq.nsmallest(length, self._asks)
+            bid_prices = heapq.nlargest(length, self._bids)
+        else:
+            ask_prices = sorted(self._asks)
+            bid_prices = sorted(self._bids, reverse=True)
+        asks = [[p, self._asks[p]] for p in ask_prices]
+        bids = [[p, self._bids[p]] for p in bid_prices]
+        return asks, bids
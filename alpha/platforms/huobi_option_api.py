@@ -8,38 +8,25 @@ Date:   2020/06/24
 Email:  andyjoe318@gmail.com
 """
 
-import gzip
-import json
-import copy
-import hmac
-import base64
-import urllib
-import hashlib
-import datetime
-import time
-from urllib.parse import urljoin
-from alpha.utils.request import AsyncHttpRequests
-from alpha.const import USER_AGENT
+from alpha.platforms.huobi_rest_client import HuobiRestClient
+from alpha.utils.cache import cached_request
+from alpha.utils.pagination import paginate
 
 
 __all__ = ("HuobiOptionRestAPI", )
 
-class HuobiOptionRestAPI:
+class HuobiOptionRestAPI(HuobiRestClient):
     """ Huobi Option REST API Client.
 
     Attributes:
         host: HTTP request host.
         access_key: Account's ACCESS KEY.
         secret_key: Account's SECRET KEY.
+        retry: Default RetryPolicy of requests, default is None (no retry).
         passphrase: API KEY Passphrase.
     """
 
-    def __init__(self, host, access_key, secret_key):
-        """ initialize REST API client. """
-        self._host = host
-        self._access_key = access_key
-        self._secret_key = secret_key
-
+    @cached_request(ttl=3600)
     async def get_option_info(self, contract_code=None):
         """ Get Option Info
         
@@ -62,6 +49,7 @@ class HuobiOptionRestAPI:
         success, error = await self.request("GET", uri, params)
         return success, error
 
+    @cached_request(ttl=10)
     async def get_price_limit(self, contract_code):
         """ Get swap price limit.
 
@@ -339,6 +327,26 @@ class HuobiOptionRestAPI:
 
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
+
+    def iter_open_orders(self, contract_code="", symbol="", trade_partition="", size=50, concurrency=4):
+        """ Iterate open orders of all pages, see `get_open_orders`.
+
+        Args:
+            contract_code: such as "BTC-USDT-200508-C-8800".
+            symbol: such as "BTC".
+            trade_partition: such as "USDT".
+            size: Page size, no more than 50.
+            concurrency: Max pages fetched concurrently.
+
+        Yields:
+            order: Order information.
+
+        Raises:
+            PageError: A page request failed.
+        """
+        return paginate(lambda index: self.get_open_orders(contract_code, symbol, trade_partition, index=index,
+                                                           size=size),
+                        "orders", concurrency=concurrency)
     
     async def get_history_orders(self, symbol,  trade_type, stype, status, \
         create_date, trade_partition="", contract_code="", order_type="", page_index=0, page_size=50):
@@ -380,6 +388,21 @@ class HuobiOptionRestAPI:
             body.update({"order_type": order_type})
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
+
+    def iter_history_orders(self, symbol, trade_type, stype, status, create_date, trade_partition="", contract_code="",
+                            order_type="", page_size=50, concurrency=4):
+        """ Iterate history orders of all pages, see `get_history_orders`.
+
+        Yields:
+            order: Order information.
+
+        Raises:
+            PageError: A page request failed.
+        """
+        return paginate(lambda index: self.get_history_orders(symbol, trade_type, stype, status, create_date,
+                                                              trade_partition, contract_code, order_type,
+                                                              page_index=index, page_size=page_size),
+                        "orders", concurrency=concurrency)
     
     async def create_trigger_order(self, contract_code, trigger_type, \
         trigger_price, order_price, order_price_type, volume, direction, offset):
@@ -492,6 +515,20 @@ class HuobiOptionRestAPI:
         
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
+
+    def iter_trigger_openorders(self, symbol, trade_partition=None, contract_code=None, page_size=50, concurrency=4):
+        """ Iterate trigger open orders of all pages, see `get_trigger_openorders`.
+
+        Yields:
+            order: Trigger order information.
+
+        Raises:
+            PageError: A page request failed.
+        """
+        return paginate(lambda index: self.get_trigger_openorders(symbol, trade_partition=trade_partition,
+                                                                  contract_code=contract_code, page_index=index,
+                                                                  page_size=page_size),
+                        "orders", concurrency=concurrency)
     
     async def get_trigger_hisorders(self, symbol, trade_type, status, create_date, trade_partition=None, contract_code=None, page_index=None, page_size=None):
         """ Get trigger hisorders
@@ -530,6 +567,22 @@ class HuobiOptionRestAPI:
         
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
+
+    def iter_trigger_hisorders(self, symbol, trade_type, status, create_date, trade_partition=None, contract_code=None,
+                               page_size=50, concurrency=4):
+        """ Iterate trigger history orders of all pages, see `get_trigger_hisorders`.
+
+        Yields:
+            order: Trigger order information.
+
+        Raises:
+            PageError: A page request failed.
+        """
+        return paginate(lambda index: self.get_trigger_hisorders(symbol, trade_type, status, create_date,
+                                                                 trade_partition=trade_partition,
+                                                                 contract_code=contract_code, page_index=index,
+                                                                 page_size=page_size),
+                        "orders", concurrency=concurrency)
     
 
     async def transfer_between_spot_option(self,  symbol, amount, from_, to, tradePartition="USDT"):
@@ -553,73 +606,3 @@ class HuobiOptionRestAPI:
         uri = "https://api.huobi.pro/v2/account/transfer"
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
-
-    
-    async def request(self, method, uri, params=None, body=None, headers=None, auth=False):
-        """ Do HTTP request.
-
-        Args:
-            method: HTTP request method. `GET` / `POST` / `DELETE` / `PUT`.
-            uri: HTTP request uri.
-            params: HTTP query params.
-            body: HTTP request body.
-            headers: HTTP request headers.
-            auth: If this request requires authentication.
-
-        Returns:
-            success: Success results, otherwise it's None.
-            error: Error information, otherwise it's None.
-        """
-        if uri.startswith("http://") or uri.startswith("https://"):
-            url = uri
-        else:
-            url = urljoin(self._host, uri)
-
-        if auth:
-            timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
-            params = params if params else {}
-            params.update({"AccessKeyId": self._access_key,
-                           "SignatureMethod": "HmacSHA256",
-                           "SignatureVersion": "2",
-                           "Timestamp": timestamp})
-
-            params["Signature"] = self.generate_signature(method, params, uri)
-
-        if not headers:
-            headers = {}
-        if method == "GET":
-            headers["Content-type"] = "application/x-www-form-urlencoded"
-            headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
-        else:
-            headers["Accept"] = "application/json"
-            headers["Content-type"] = "application/json"
-            headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body, headers=headers,
-                                                              timeout=10)
-        if error:
-            return None, error
-        if not isinstance(success, dict):
-            result = json.loads(success)
-        else:
-            result = success
-        if result.get("status") != "ok":
-            return None, result
-        return result, None
-
-    def generate_signature(self, method, params, request_path):
-        if request_path.startswith("http://") or request_path.startswith("https://"):
-            host_url = urllib.parse.urlparse(request_path).hostname.lower()
-            request_path = '/' + '/'.join(request_path.split('/')[3:])
-        else:
-            host_url = urllib.parse.urlparse(self._host).hostname.lower()
-        sorted_params = sorted(params.items(), key=lambda d: d[0], reverse=False)
-        encode_params = urllib.parse.urlencode(sorted_params)
-        payload = [method, host_url, request_path, encode_params]
-        payload = "\n".join(payload)
-        payload = payload.encode(encoding="UTF8")
-        secret_key = self._secret_key.encode(encoding="utf8")
-        digest = hmac.new(secret_key, payload, digestmod=hashlib.sha256).digest()
-        signature = base64.b64encode(digest)
-        signature = signature.decode()
-        return signature
@@ -0,0 +1,272 @@
+# -*- coding:utf-8 -*-
+
+"""
+Huobi REST API client base and request signer.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import hmac
+import time
+import base64
+import hashlib
+import datetime
+import functools
+from urllib.parse import urljoin, urlparse, urlencode, quote_plus
+
+from alpha.utils.request import AsyncHttpRequests
+from alpha.utils import codec
+from alpha.utils.journal import journal
+from alpha.utils.ratelimit import rate_limiter, PRIORITY_TRADE
+from alpha.const import USER_AGENT
+
+__all__ = ("HuobiRestClient", "HuobiSigner", "hostname", "merge_batch_orders", "merge_batch_revokes")
+
+
+@functools.lru_cache(maxsize=64)
+def hostname(url):
+    """ Lower case host name of url, e.g. `api.hbdm.com`. """
+    return urlparse(url).hostname.lower()
+
+
+def merge_batch_orders(results):
+    """ Merge results of batch order chunks, see `alpha.utils.batch.batch_request`.
+
+    Args:
+        results: [(offset, chunk, success, error), ...] of `create_orders` requests. The exchange replies
+            `{"success": [{"index": 1, "order_id": ...}], "errors": [{"index": 2, "err_code": ..., "err_msg": ...}]}`,
+            `index` starts from 1 in every chunk.
+
+    Returns:
+        success: Order ids of created orders in input order, `{"index": {index: order_id, ... }, "client_order_id":
+            {client_order_id: order_id, ... }}`, `index` is the index in input orders (start from 1), orders without
+            `client_order_id` are only in the index map.
+        errors: Errors in input order, `index` is the index in input orders (start from 1), and `client_order_id` is
+            added. If the request of a chunk failed, every order of the chunk gets `{"err_msg": error}`.
+    """
+    success = {}
+    errors = []
+    for offset, chunk, result, error in results:
+        if error:
+            for i in range(len(chunk)):
+                errors.append({"index": offset + i + 1, "client_order_id": chunk[i].get("client_order_id"),
+                               "err_code": None, "err_msg": error})
+            continue
+        data = result.get("data") or {}
+        for item in data.get("success") or []:
+            success[offset + item["index"]] = (item["order_id"], chunk[item["index"] - 1].get("client_order_id"))
+        for item in data.get("errors") or []:
+            item = dict(item, index=offset + item["index"],
+                        client_order_id=chunk[item["index"] - 1].get("client_order_id"))
+            errors.append(item)
+    errors.sort(key=lambda item: item["index"])
+    by_index = {}
+    by_client_order_id = {}
+    for index in sorted(success):
+        order_id, client_order_id = success[index]
+        by_index[index] = order_id
+        if client_order_id not in (None, ""):
+            by_client_order_id[client_order_id] = order_id
+    return {"index": by_index, "client_order_id": by_client_order_id}, errors
+
+
+def merge_batch_revokes(results):
+    """ Merge results of batch cancel chunks, see `alpha.utils.batch.batch_request`.
+
+    Args:
+        results: [(offset, chunk, success, error), ...] of cancel requests, `chunk` is the order id (or client order
+            id) list of a request. The exchange replies `{"successes": "id1,id2", "errors": [{"order_id": "id3",
+            "err_code": ..., "err_msg": ...}]}`.
+
+    Returns:
+        outcomes: `{id: error, ... }` of every id in input order, error is None if the order is cancelled.
+        errors: `{id: error, ... }` of orders failed to cancel, None if all orders are cancelled.
+    """
+    outcomes = {}
+    for _, chunk, result, error in results:
+        if error:
+            for id_ in chunk:
+                outcomes[id_] = error
+            continue
+        data = result.get("data") or {}
+        cancelled = set(data.get("successes", "").split(","))
+        failed = {}
+        for item in data.get("errors") or []:
+            failed[str(item.get("order_id") or item.get("client_order_id"))] = item
+        for id_ in chunk:
+            if id_ in cancelled:
+                outcomes[id_] = None
+            else:
+                outcomes[id_] = failed.get(id_, {"order_id": id_, "err_code": None, "err_msg": "order not cancelled"})
+    errors = {id_: error for id_, error in outcomes.items() if error is not None}
+    return outcomes, errors or None
+
+
+class HuobiSigner:
+    """ Huobi signature v2 signer of an account.
+
+    Args:
+        access_key: Account's ACCESS KEY.
+        secret_key: Account's SECRET KEY.
+
+    * NOTE: The HMAC keyed by secret key and the encoded static params are created once, every signature copies the
+            keyed HMAC, and only the timestamp and request params are encoded.
+    """
+
+    def __init__(self, access_key, secret_key):
+        self._access_key = access_key
+        self._hmac = hmac.new(secret_key.encode("utf8"), digestmod=hashlib.sha256)
+        self._prefix = urlencode([("AccessKeyId", access_key), ("SignatureMethod", "HmacSHA256"),
+                                  ("SignatureVersion", "2")]) + "&Timestamp="
+
+    def sign(self, method, host, path, params=None):
+        """ Sign a request.
+
+        Args:
+            method: HTTP request method, `GET` / `POST`.
+            host: Request host name, e.g. `api.hbdm.com`.
+            path: Request path, e.g. `/swap-api/v1/swap_order`.
+            params: Request query params, not modified.
+
+        Returns:
+            signed: New params dict with `AccessKeyId`, `SignatureMethod`, `SignatureVersion`, `Timestamp` and
+                `Signature`.
+        """
+        timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
+        signed = dict(params) if params else {}
+        signed.update({"AccessKeyId": self._access_key,
+                       "SignatureMethod": "HmacSHA256",
+                       "SignatureVersion": "2",
+                       "Timestamp": timestamp})
+        signed["Signature"] = self.signature(method, host, path, params, timestamp)
+        return signed
+
+    def signature(self, method, host, path, params, timestamp):
+        """ Signature of a request.
+
+        Args:
+            method: HTTP request method, `GET` / `POST`.
+            host: Request host name.
+            path: Request path.
+            params: Request query params, without the auth params.
+            timestamp: UTC time, e.g. `2020-12-01T08:00:00`.
+        """
+        if not params:
+            query = self._prefix + quote_plus(timestamp)
+        elif min(params) > "Timestamp":
+            # Huobi params are lower case, they are sorted after the auth params.
+            query = self._prefix + quote_plus(timestamp) + "&" + urlencode(sorted(params.items()))
+        else:
+            merged = dict(params)
+            merged.update({"AccessKeyId": self._access_key,
+                           "SignatureMethod": "HmacSHA256",
+                           "SignatureVersion": "2",
+                           "Timestamp": timestamp})
+            query = urlencode(sorted(merged.items()))
+        h = self._hmac.copy()
+        h.update("\n".join((method, host, path, query)).encode("utf8"))
+        return base64.b64encode(h.digest()).decode()
+
+
+class HuobiRestClient:
+    """ Huobi REST API client base.
+
+    Attributes:
+        host: HTTP request host.
+        access_key: Account's ACCESS KEY.
+        secret_key: Account's SECRET KEY.
+        retry: Default RetryPolicy of requests, default is None (no retry).
+    """
+
+    def __init__(self, host, access_key, secret_key, retry=None):
+        """ initialize REST API client. """
+        self._host = host
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._retry = retry
+        self._signer = HuobiSigner(access_key, secret_key) if access_key and secret_key else None
+
+    async def request(self, method, uri, params=None, body=None, headers=None, auth=False, retry=None):
+        """ Do HTTP request.
+
+        Args:
+            method: HTTP request method. `GET` / `POST` / `DELETE` / `PUT`.
+            uri: HTTP request uri.
+            params: HTTP query params.
+            body: HTTP request body.
+            headers: HTTP request headers.
+            auth: If this request requires authentication.
+            retry: RetryPolicy to retry on retryable errors, default is the policy of this client. Requests to place
+                or cancel orders are only retried if `retry.retry_trade` is True.
+
+        Returns:
+            success: Success results, otherwise it's None.
+            error: Error information, otherwise it's None.
+        """
+        retry = retry or self._retry
+        if retry and (retry.retry_trade or rate_limiter.classify(uri, auth) != PRIORITY_TRADE):
+            _, success, error = await retry.call(self._request, method, uri, params, body, headers, auth)
+        else:
+            _, success, error = await self._request(method, uri, params, body, headers, auth)
+        return success, error
+
+    async def _request(self, method, uri, params, body, headers, auth):
+        """ Do HTTP request once, see `request`.
+
+        Returns:
+            code: HTTP response code, None if no response.
+            success: Success results, otherwise it's None.
+            error: Error information, otherwise it's None.
+        """
+        if uri.startswith("http://") or uri.startswith("https://"):
+            url = uri
+            host, path = hostname(uri), "/" + "/".join(uri.split("/")[3:])
+        else:
+            url = urljoin(self._host, uri)
+            host, path = hostname(self._host), uri
+
+        if auth:
+            # Sign a new params dict on every attempt, the request may be retried.
+            params = self._signer.sign(method, host, path, params)
+
+        if not headers:
+            headers = {}
+        priority = rate_limiter.classify(uri, auth)
+        rate_limit = rate_limiter.bucket(self._access_key if auth else None, priority)
+        start = time.monotonic()
+        if method == "GET":
+            headers["Content-type"] = "application/x-www-form-urlencoded"
+            headers["User-Agent"] = USER_AGENT
+            code, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers,
+                                                                 timeout=10, rate_limit=rate_limit, priority=priority)
+        else:
+            headers["Accept"] = "application/json"
+            headers["Content-type"] = "application/json"
+            headers["User-Agent"] = USER_AGENT
+            code, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body,
+                                                                 headers=headers, timeout=10, rate_limit=rate_limit,
+                                                                 priority=priority)
+        if journal.enabled:
+            if params:
+                params = {k: v for k, v in params.items() if k not in ("AccessKeyId", "Signature")}
+            journal.record("rest", {
+                "method": method,
+                "uri": uri,
+                "params": params,
+                "body": body,
+                "code": code,
+                "elapsed_ms": round((time.monotonic() - start) * 1000, 3),
+                "status": success.get("status") if isinstance(success, dict) else None,
+                "error": str(error) if error else None
+            })
+        if error:
+            return code, None, error
+        if not isinstance(success, dict):
+            result = codec.loads(success)
+        else:
+            result = success
+        if result.get("status") != "ok" and result.get("code") != 200:  # v2 APIs return `code` instead of `status`.
+            return code, None, result
+        return code, result, None
@@ -8,39 +8,26 @@ Date:   2020/09/10
 Email:  ***
 """
 
-import gzip
-import json
-import copy
-import hmac
-import base64
-import urllib
-import hashlib
-import datetime
-import time
-from urllib.parse import urljoin
-from alpha.utils.request import AsyncHttpRequests
-from alpha.const import USER_AGENT
+from alpha.platforms.huobi_rest_client import HuobiRestClient
+from alpha.utils.cache import cached_request
+from alpha.utils.pagination import paginate_cursor
 
 
 __all__ = ("HuobiSpotRestAPI", )
 
-class HuobiSpotRestAPI:
+class HuobiSpotRestAPI(HuobiRestClient):
     """ Huobi Spot REST API Client.
 
     Attributes:
         host: HTTP request host.
         access_key: Account's ACCESS KEY.
         secret_key: Account's SECRET KEY.
+        retry: Default RetryPolicy of requests, default is None (no retry).
         passphrase: API KEY Passphrase.
     """
 
-    def __init__(self, host, access_key, secret_key):
-        """ initialize REST API client. """
-        self._host = host
-        self._access_key = access_key
-        self._secret_key = secret_key
-
 
+    @cached_request(ttl=60)
     async def get_etp_reference(self, etpName=None):
         """ Get ETP Reference
         
@@ -56,7 +43,7 @@ class HuobiSpotRestAPI:
         """
         uri = "/v2/etp/reference"
         params = {}
-        if etp_code:
+        if etpName:
             params["etpName"] = etpName
         success, error = await self.request("GET", uri, params)
         return success, error
@@ -125,7 +112,7 @@ class HuobiSpotRestAPI:
         return success, error
 
     
-    async def create_order(self, account_id, symbol, _type, amount, price=None, source="spot-api", client_order_id=None, stop_price=None, operater=None):
+    async def create_order(self, account_id, symbol, _type, amount, price=None, source="spot-api", client_order_id=None, stop_price=None, operator=None):
         """ Create an new order.
 
         Args:
@@ -152,15 +139,15 @@ class HuobiSpotRestAPI:
         if price:
             body.update({"price": price})
         if source:
-            body.update({"source": souce})
+            body.update({"source": source})
         if stop_price:
             body.update({"stop_price": stop_price})
-        if operater:
+        if operator:
             body.update({"operator": operator})
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
     
-    async def create_orders(self, source="spot-api", orders_data):
+    async def create_orders(self, orders_data):
         """ Batch Create orders.
             orders_data = {'orders_data': [
                {  
@@ -315,23 +302,23 @@ class HuobiSpotRestAPI:
             error: Error information, otherwise it's None.
         """
         uri = "/v1/order/openOrders"
-        body = {
+        params = {
             "account-id": account_id,
             "symbol": symbol,
             "size": size
         }
         if side:
-            body.update({"side": side})
+            params.update({"side": side})
         if _from:
-            body.update({"from": _from})
+            params.update({"from": _from})
         if direct:
-            body.update({"direct": direct})
+            params.update({"direct": direct})
 
-        success, error = await self.request("POST", uri, body=body, auth=True)
+        success, error = await self.request("GET", uri, params=params, auth=True)
         return success, error
 
 
-    async def create_etp(self, etpName, value, curency):
+    async def create_etp(self, etpName, value, currency):
         """ ETP Creation
 
         Args:
@@ -366,27 +353,6 @@ class HuobiSpotRestAPI:
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
 
-     async def get_orderbook(self, symbol, depth=None):
-        """ Get orderbook information.
-
-        Args:
-            contract_code:  such as "BTCUSDT".
-
-        Returns:
-            success: Success results, otherwise it's None.
-            error: Error information, otherwise it's None.
-        """
-        uri = "/market/depth"
-        params = {
-            "symbol": symbol,
-            "type": "step0"
-        }
-
-        if depth:
-            params["depth"] = depth
-        success, error = await self.request("GET", uri, params=params)
-        return success, error
-
     async def get_etp_transactions(self, etpNames=[], currencies=[], transactTypes="", transactStatus="", startTime=None, endTime=None, sort="", limit=100, fromId=None):
         """ Get ETP Transaction Record
 
@@ -421,8 +387,8 @@ class HuobiSpotRestAPI:
             params["endTime"] = endTime
         if sort:
             params["sort"] = sort
-        if fromID:
-            params["fromID"] = fromID
+        if fromId:
+            params["fromId"] = fromId
         success, error = await self.request("GET", uri, params=params)
         return success, error  
 
@@ -459,7 +425,7 @@ class HuobiSpotRestAPI:
         """
         uri = "/v2/etp/rebalance"
         params = {
-            "symbol": symbol
+            "symbol": symbol,
             "limit": limit
         }
         if rebalTypes:
@@ -501,10 +467,11 @@ class HuobiSpotRestAPI:
         """
         uri = "/v1/order/orders"
         params = {
-            "symbol": symbol,
-            "states": states
+            "symbol": symbol
         }
         if types:
+            params["types"] = ",".join(types)
+        if states:
             params["states"] = ",".join(states)
         if start_time:
             params["start-time"] = start_time
@@ -521,7 +488,7 @@ class HuobiSpotRestAPI:
         if size:
             params["size"] = size
 
-        success, error = await self.request("GET", uri, params=params)
+        success, error = await self.request("GET", uri, params=params, auth=True)
         return success, error    
 
     async def transfer_between_spot_future(self, symbol, amount, type_s):
@@ -542,72 +509,48 @@ class HuobiSpotRestAPI:
 
         success, error = await self.request("POST", uri, body=body, auth=True)
         return success, error
-    
-    async def request(self, method, uri, params=None, body=None, headers=None, auth=False):
-        """ Do HTTP request.
 
-        Args:
-            method: HTTP request method. `GET` / `POST` / `DELETE` / `PUT`.
-            uri: HTTP request uri.
-            params: HTTP query params.
-            body: HTTP request body.
-            headers: HTTP request headers.
-            auth: If this request requires authentication.
+    def iter_open_orders(self, account_id, symbol, side="", _from="", size=100):
+        """ Iterate open orders of all pages from the latest (or `_from`) to the earliest, see `get_open_orders`.
 
-        Returns:
-            success: Success results, otherwise it's None.
-            error: Error information, otherwise it's None.
+        Yields:
+            order: Order information.
+
+        Raises:
+            PageError: A page request failed.
+        """
+        return paginate_cursor(lambda cursor: self.get_open_orders(account_id, symbol, side, cursor or "", "next",
+                                                                   size),
+                               "data", lambda success, items: items[-1]["id"] if len(items) >= size else None,
+                               _from or None)
+
+    def iter_history_orders(self, symbol, types=[], start_time=None, end_time=None, start_date="", end_date="",
+                            states=[], _from="", size=100):
+        """ Iterate history orders of all pages from the latest (or `_from`) to the earliest, see
+        `get_history_orders`.
+
+        Yields:
+            order: Order information.
+
+        Raises:
+            PageError: A page request failed.
+        """
+        return paginate_cursor(lambda cursor: self.get_history_orders(symbol, types, start_time, end_time, start_date,
+                                                                      end_date, states, cursor or "", "next", size),
+                               "data", lambda success, items: items[-1]["id"] if len(items) >= size else None,
+                               _from or None)
+
+    def iter_etp_transactions(self, etpNames=[], currencies=[], transactTypes="", transactStatus="", startTime=None,
+                              endTime=None, sort="", limit=100, fromId=None):
+        """ Iterate ETP transaction records of all pages, see `get_etp_transactions`.
+
+        Yields:
+            transaction: ETP transaction record.
+
+        Raises:
+            PageError: A page request failed.
         """
-        if uri.startswith("http://") or uri.startswith("https://"):
-            url = uri
-        else:
-            url = urljoin(self._host, uri)
-
-        if auth:
-            timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
-            params = params if params else {}
-            params.update({"AccessKeyId": self._access_key,
-                           "SignatureMethod": "HmacSHA256",
-                           "SignatureVersion": "2",
-                           "Timestamp": timestamp})
-
-            params["Signature"] = self.generate_signature(method, params, uri)
-
-        if not headers:
-            headers = {}
-        if method == "GET":
-            headers["Content-type"] = "application/x-www-form-urlencoded"
-            headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("GET", url, params=params, headers=headers, timeout=10)
-        else:
-            headers["Accept"] = "application/json"
-            headers["Content-type"] = "application/json"
-            headers["User-Agent"] = USER_AGENT
-            _, success, error = await AsyncHttpRequests.fetch("POST", url, params=params, data=body, headers=headers,
-                                                              timeout=10)
-        if error:
-            return None, error
-        if not isinstance(success, dict):
-            result = json.loads(success)
-        else:
-            result = success
-        if result.get("status") != "ok":
-            return None, result
-        return result, None
-
-    def generate_signature(self, method, params, request_path):
-        if request_path.startswith("http://") or request_path.startswith("https://"):
-            host_url = urllib.parse.urlparse(request_path).hostname.lower()
-            request_path = '/' + '/'.join(request_path.split('/')[3:])
-        else:
-            host_url = urllib.parse.urlparse(self._host).hostname.lower()
-        sorted_params = sorted(params.items(), key=lambda d: d[0], reverse=False)
-        encode_params = urllib.parse.urlencode(sorted_params)
-        payload = [method, host_url, request_path, encode_params]
-        payload = "\n".join(payload)
-        payload = payload.encode(encoding="UTF8")
-        secret_key = self._secret_key.encode(encoding="utf8")
-        digest = hmac.new(secret_key, payload, digestmod=hashlib.sha256).digest()
-        signature = base64.b64encode(digest)
-        signature = signature.decode()
-        return signature
+        return paginate_cursor(lambda cursor: self.get_etp_transactions(etpNames, currencies, transactTypes,
+                                                                        transactStatus, startTime, endTime, sort,
+                                                                        limit, cursor),
+                               "data", lambda success, items: success.get("nextId"), fromId)
@@ -8,20 +8,18 @@ Date:   2020/9/10
 Email:  andyjoe318@gmail.com
 """
 
-import gzip
-import json
 import time
 import asyncio
-import copy
-from collections import deque
 
 from alpha.utils import logger
 from alpha.utils.websocket import Websocket
+from alpha.utils.ringbuffer import RingBuffer
 from alpha.utils.decorator import async_method_locker
-from alpha.const import MARKET_TYPE_KLINE
+from alpha.const import MARKET_TYPE_KLINE, WS_OVERFLOW_BLOCK, WS_OVERFLOW_DROP_OLDEST
+from alpha.const import ORDERBOOK_TYPE_SNAPSHOT, ORDERBOOK_TYPE_INCREMENTAL
 from alpha.order import ORDER_ACTION_BUY, ORDER_ACTION_SELL
-from alpha.tasks import SingleTask
-from alpha.orderbook import Orderbook
+from alpha.tasks import SingleTask, ConflateTask
+from alpha.orderbook import Orderbook, LocalOrderbook
 from alpha.markettrade import Trade
 from alpha.kline import Kline
 
@@ -33,8 +31,19 @@ class HuobiUsdtSwapMarket(Websocket):
             platform: Exchange platform name, must be `huobi_usdt_swap`.
             wss: Exchange Websocket host address.
             symbols: Trade pair list, e.g. ["BTC_USDT"].
-            channels: channel list, only `orderbook`, `kline` and `trade` to be enabled.
+            channels: channel list, `orderbook`, `kline`, `trade` or types added by `register_channel_type`.
             orderbook_length: The length of orderbook's data to be published via OrderbookEvent, default is 10.
+            orderbook_type: `snapshot` (default) subscribes full depth snapshots, `incremental` maintains a local
+                orderbook from the incremental depth channel and resyncs automatically on version gaps.
+            orderbook_depth: Depth of the incremental depth channel, 20 or 150, default is 20.
+            queue_size: Length of the websocket message queue, default is 0 (process messages inline).
+            overflow_policy: What to do when the message queue is full, `block`, `drop_oldest` or `conflate`.
+                `drop_oldest` is not allowed with `incremental` orderbook. Pings, trades and incremental depth updates
+                are never conflated or dropped.
+            conflate_channels: Channel list whose callbacks only receive the latest update per symbol, while the
+                previous callback is still running, e.g. ["orderbook", "kline"].
+            decompress_offload_size: Messages not smaller than this size (bytes) are decompressed in a thread pool,
+                default is 0 (always decompress in the event loop).
     """
 
     def __init__(self, **kwargs):
@@ -43,33 +52,100 @@ class HuobiUsdtSwapMarket(Websocket):
         self._symbols = list(set(kwargs.get("symbols")))
         self._channels = kwargs.get("channels")
         self._orderbook_length = kwargs.get("orderbook_length", 10)
-        self._orderbooks_length = kwargs.get("orderbooks_length", 100)
-        self._klines_length = kwargs.get("klines_length", 100)
-        self._trades_length = kwargs.get("trades_length", 100)
+        self._orderbooks_length = kwargs.get("orderbooks_length") or 100
+        self._orderbook_type = kwargs.get("orderbook_type") or ORDERBOOK_TYPE_SNAPSHOT
+        self._orderbook_depth = kwargs.get("orderbook_depth") or 20
+        self._klines_length = kwargs.get("klines_length") or 100
+        self._trades_length = kwargs.get("trades_length") or 100
         self._orderbook_update_callback = kwargs.get("orderbook_update_callback")
         self._kline_update_callback = kwargs.get("kline_update_callback")
         self._trade_update_callback = kwargs.get("trade_update_callback")
+        self._conflate_channels = kwargs.get("conflate_channels") or []
 
-        self._c_to_s = {}  # {"channel": "symbol"}
-        self._orderbooks = deque(maxlen=self._orderbooks_length) 
-        self._klines = deque(maxlen=self._klines_length)
-        self._trades = deque(maxlen=self._trades_length)
+        self._subscriptions = {}  # {"channel": (symbol, handler)}, registered by `_symbol_to_channel`.
+        self._local_orderbooks = {}  # {"symbol": LocalOrderbook}, only for incremental orderbook.
+        self._orderbooks = RingBuffer(self._orderbooks_length)
+        self._klines = RingBuffer(self._klines_length)
+        self._trades = RingBuffer(self._trades_length)
+        self._orderbooks_view = self._orderbooks.view()
+        self._klines_view = self._klines.view()
+        self._trades_view = self._trades.view()
+        # History per symbol, {"symbol": RingBuffer}.
+        self._symbol_orderbooks = {symbol: RingBuffer(self._orderbooks_length) for symbol in self._symbols}
+        self._symbol_klines = {symbol: RingBuffer(self._klines_length) for symbol in self._symbols}
+        self._symbol_trades = {symbol: RingBuffer(self._trades_length) for symbol in self._symbols}
+
+        # Channel types, {"channel_type": (channel name template, handler)}, see `register_channel_type`.
+        if self._orderbook_type == ORDERBOOK_TYPE_INCREMENTAL:
+            depth_channel = "market.{s}.depth.size_%d.high_freq" % self._orderbook_depth
+        else:
+            depth_channel = "market.{s}.depth.step6"
+        self._channel_types = {
+            "kline": ("market.{s}.kline.1min", self.process_kline),
+            "depth": (depth_channel, self.process_orderbook),
+            "trade": ("market.{s}.trade.detail", self.process_trade)
+        }
+
+        self._orderbook_conflater = None
+        if "orderbook" in self._conflate_channels and self._orderbook_update_callback:
+            self._orderbook_conflater = ConflateTask(self._orderbook_update_callback)
+        self._kline_conflater = None
+        if "kline" in self._conflate_channels and self._kline_update_callback:
+            self._kline_conflater = ConflateTask(self._kline_update_callback)
 
         url = self._wss + "/linear-swap-ws"
-        super(HuobiUsdtSwapMarket, self).__init__(url, send_hb_interval=5)
+        queue_size = kwargs.get("queue_size") or 0
+        overflow_policy = kwargs.get("overflow_policy") or WS_OVERFLOW_BLOCK
+        if self._orderbook_type == ORDERBOOK_TYPE_INCREMENTAL and queue_size and \
+                overflow_policy == WS_OVERFLOW_DROP_OLDEST:
+            # A dropped depth update is a version gap, the local orderbook would resync again and again.
+            raise ValueError("overflow_policy `drop_oldest` drops incremental depth updates, "
+                             "use `block` or `conflate` with orderbook_type `incremental`")
+        decompress_offload_size = kwargs.get("decompress_offload_size") or 0
+        super(HuobiUsdtSwapMarket, self).__init__(url, send_hb_interval=5, queue_size=queue_size, overflow_policy=overflow_policy,
+                                                  decompress_offload_size=decompress_offload_size)
         self.initialize()
     
     @property
     def orderbooks(self):
-        return copy.copy(self._orderbooks)
+        return self._orderbooks_view
 
     @property
     def klines(self):
-        return copy.copy(self._klines)
+        return self._klines_view
 
     @property
     def trades(self):
-        return copy.copy(self._trades)
+        return self._trades_view
+
+    def orderbooks_for(self, symbol):
+        """ Read-only view of the latest orderbooks of a symbol, None if the symbol is not subscribed.
+        """
+        buffer = self._symbol_orderbooks.get(symbol)
+        return buffer.view() if buffer is not None else None
+
+    def klines_for(self, symbol):
+        """ Read-only view of the latest klines of a symbol, None if the symbol is not subscribed.
+        """
+        buffer = self._symbol_klines.get(symbol)
+        return buffer.view() if buffer is not None else None
+
+    def trades_for(self, symbol):
+        """ Read-only view of the latest trades of a symbol, None if the symbol is not subscribed.
+        """
+        buffer = self._symbol_trades.get(symbol)
+        return buffer.view() if buffer is not None else None
+
+    @property
+    def conflate_stats(self):
+        """ Conflated delivery statistics, {"orderbook": {symbol: {"delivered": n, "conflated": m}}, ...}.
+        """
+        stats = {}
+        if self._orderbook_conflater:
+            stats["orderbook"] = self._orderbook_conflater.stats
+        if self._kline_conflater:
+            stats["kline"] = self._kline_conflater.stats
+        return stats
 
     async def _send_heartbeat_msg(self, *args, **kwargs):
         """ 发送心跳给服务器
@@ -79,7 +155,7 @@ class HuobiUsdtSwapMarket(Websocket):
             return
         data = {"pong": int(time.time()*1000)}
         try:
-            await self.ws.send_json(data)
+            await self.send_json(data)
         except ConnectionResetError:
             await asyncio.get_event_loop().create_task(self._reconnect())
 
@@ -87,85 +163,86 @@ class HuobiUsdtSwapMarket(Websocket):
         """ After create Websocket connection successfully, we will subscribing orderbook/trade events.
         """
         for ch in self._channels:
-            if ch == "kline":
-                for symbol in self._symbols:
-                    channel = self._symbol_to_channel(symbol, "kline")
-                    if not channel:
-                        continue
-                    kline = {
-                        "sub": channel
-                    }
-                    await self.ws.send_json(kline)
-            elif ch == "orderbook":
-                for symbol in self._symbols:
-                    channel = self._symbol_to_channel(symbol, "depth")
-                    if not channel:
-                        continue
-                    data = {
-                        "sub": channel
-                    }
-                    await self.ws.send_json(data)
-            elif ch == "trade":
-                for symbol in self._symbols:
-                    channel = self._symbol_to_channel(symbol, "trade")
-                    if not channel:
-                        continue
-                    data = {
-                        "sub": channel
-                    }
-                    await self.ws.send_json(data)
-            else:
+            channel_type = "depth" if ch == "orderbook" else ch
+            if channel_type not in self._channel_types:
                 logger.error("channel error! channel:", ch, caller=self)
+                continue
+            for symbol in self._symbols:
+                channel = self._symbol_to_channel(symbol, channel_type)
+                if not channel:
+                    continue
+                data = {
+                    "sub": channel
+                }
+                if channel_type == "depth" and self._orderbook_type == ORDERBOOK_TYPE_INCREMENTAL:
+                    data["data_type"] = "incremental"
+                    self._local_orderbooks[symbol] = LocalOrderbook(self._platform, symbol)
+                await self.send_json(data)
+
+    async def decode_binary(self, msg):
+        """ Decode binary message that received from Websocket connection.
+        """
+        return await self.decode_gzip(msg)
+
+    def conflate_key(self, msg_type, data):
+        """ Trades and incremental depth updates are never conflated, every message of them is needed.
+        """
+        channel = super(HuobiUsdtSwapMarket, self).conflate_key(msg_type, data)
+        if channel and (channel.endswith(".trade.detail") or channel.endswith(".high_freq")):
+            return None
+        return channel
 
     async def process_binary(self, msg):
         """ Process binary message that received from Websocket connection.
         """
-        data = json.loads(gzip.decompress(msg).decode())
-        logger.debug("data:", json.dumps(data), caller=self)
+        await self.process(await self.decode_binary(msg))
+
+    async def process(self, data):
+        """ Process decoded message.
+        """
+        logger.debug("data:", logger.lazy_json(data), caller=self)
         channel = data.get("ch")
         if not channel:
             if data.get("ping"):
                 hb_msg = {"pong": data.get("ping")}
-                await self.ws.send_json(hb_msg)
+                await self.send_json(hb_msg)
             return
 
-        symbol = self._c_to_s[channel]
+        subscription = self._subscriptions.get(channel)
+        if not subscription:
+            logger.error("event error! msg:", data, caller=self)
+            return
+        symbol, handler = subscription
+        await handler(symbol, data)
 
-        if channel.find("kline") != -1:
-            await self.process_kline(data)
+    def register_channel_type(self, channel_type, channel, handler):
+        """ Register a channel type, so that it can be subscribed via `channels`.
 
-        elif channel.find("depth") != -1:
-            await self.process_orderbook(data)
-        
-        elif channel.find("trade") != -1:
-            await self.process_trade(data)
-        else:
-            logger.error("event error! msg:", msg, caller=self)
+        Args:
+            channel_type: Channel type name, e.g. bbo.
+            channel: Channel name template, `{s}` will be replaced by upper case symbol, e.g. `market.{s}.bbo`.
+            handler: Asynchronous message handler, like `async def handler(symbol, data): pass`.
+        """
+        self._channel_types[channel_type] = (channel, handler)
 
     def _symbol_to_channel(self, symbol, channel_type):
         """ Convert symbol to channel.
 
         Args:
             symbol: Trade pair name.such as BTC-USD
-            channel_type: channel name, kline / ticker / depth.
-        """
-        if channel_type == "kline":
-            channel = "market.{s}.kline.1min".format(s=symbol.upper())
-        elif channel_type == "depth":
-            channel = "market.{s}.depth.step6".format(s=symbol.upper())
-        elif channel_type == "trade":
-            channel = "market.{s}.trade.detail".format(s=symbol.upper())
-        else:
+            channel_type: channel type, kline / depth / trade, or registered by `register_channel_type`.
+        """
+        if channel_type not in self._channel_types:
             logger.error("channel type error! channel type:", channel_type, caller=self)
             return None
-        self._c_to_s[channel] = symbol
+        channel, handler = self._channel_types[channel_type]
+        channel = channel.format(s=symbol.upper())
+        self._subscriptions[channel] = (symbol, handler)
         return channel
     
-    async def process_kline(self, data):
+    async def process_kline(self, symbol, data):
         """ process kline data
         """
-        channel = data.get("ch")
-        symbol = self._c_to_s[channel]
         d = data.get("tick")
         info = {
             "platform": self._platform,
@@ -180,44 +257,51 @@ class HuobiUsdtSwapMarket(Websocket):
         }
         kline = Kline(**info)
         self._klines.append(kline)
-        SingleTask.run(self._kline_update_callback, copy.copy(kline))
+        self._symbol_klines[symbol].append(kline)
+        if self._kline_conflater:
+            self._kline_conflater.run(symbol, kline)
+        else:
+            SingleTask.run(self._kline_update_callback, kline)
 
         logger.debug("symbol:", symbol, "kline:", kline, caller=self)
 
-    async def process_orderbook(self, data):
+    async def process_orderbook(self, symbol, data):
         """ process orderbook data
         """
         channel = data.get("ch")
-        symbol = self._c_to_s[channel]
         d = data.get("tick")
-        asks, bids = [], []
-        if d.get("asks"):
-            for item in d.get("asks")[:self._orderbook_length]:
-                price = "%.8f" % item[0]
-                quantity = "%.8f" % item[1]
-                asks.append([price, quantity])
-        if d.get("bids"):
-            for item in d.get("bids")[:self._orderbook_length]:
-                price = "%.8f" % item[0]
-                quantity = "%.8f" % item[1]
-                bids.append([price, quantity])
-        info = {
-            "platform": self._platform,
-            "symbol": symbol,
-            "asks": asks,
-            "bids": bids,
-            "timestamp": d.get("ts")
-        }
-        orderbook = Orderbook(**info)
+        if self._orderbook_type == ORDERBOOK_TYPE_INCREMENTAL:
+            local_orderbook = self._local_orderbooks.get(symbol)
+            if not local_orderbook:
+                local_orderbook = self._local_orderbooks[symbol] = LocalOrderbook(self._platform, symbol)
+            if not local_orderbook.apply(d, d.get("ts")):
+                logger.warn("orderbook version gap, resync! symbol:", symbol, "version:", d.get("version"), caller=self)
+                await self._resync_orderbook(channel)
+                return
+            if not local_orderbook.synced:
+                return
+            ask_levels, bid_levels = local_orderbook.levels(self._orderbook_length)
+        else:
+            ask_levels = (d.get("asks") or [])[:self._orderbook_length]
+            bid_levels = (d.get("bids") or [])[:self._orderbook_length]
+        orderbook = Orderbook.from_levels(self._platform, symbol, ask_levels, bid_levels, d.get("ts"))
         self._orderbooks.append(orderbook)
-        SingleTask.run(self._orderbook_update_callback, copy.copy(orderbook))
+        self._symbol_orderbooks[symbol].append(orderbook)
+        if self._orderbook_conflater:
+            self._orderbook_conflater.run(symbol, orderbook)
+        else:
+            SingleTask.run(self._orderbook_update_callback, orderbook)
         logger.debug("symbol:", symbol, "orderbook:", orderbook, caller=self)
     
-    async def process_trade(self, data):
+    async def _resync_orderbook(self, channel):
+        """ Re-subscribe incremental depth channel, the server will push a new snapshot first.
+        """
+        await self.send_json({"unsub": channel, "data_type": "incremental"})
+        await self.send_json({"sub": channel, "data_type": "incremental"})
+
+    async def process_trade(self, symbol, data):
         """ process trade
         """
-        channel = data.get("ch")
-        symbol = self._c_to_s[channel]
         ticks = data.get("tick")
         for tick in ticks["data"]: 
             direction = tick.get("direction")
@@ -233,7 +317,8 @@ class HuobiUsdtSwapMarket(Websocket):
             }
             trade = Trade(**info)
             self._trades.append(trade)
-            SingleTask.run(self._trade_update_callback, copy.copy(trade))
+            self._symbol_trades[symbol].append(trade)
+            SingleTask.run(self._trade_update_callback, trade)
             logger.debug("symbol:", symbol, "trade:", trade, caller=self)
         
 
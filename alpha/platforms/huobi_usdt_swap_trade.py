@@ -8,36 +8,29 @@ Date:   2020/09/02
 Email:  andyjoe318@gmail.com
 """
 
-import gzip
-import json
 import copy
-import datetime
+import asyncio
 import time
-import urllib
-import hmac
-import base64
-import urllib
-import hashlib
-import datetime
-import time
-from urllib.parse import urljoin
 
 from alpha.asset import Asset
 from alpha.order import Order
 from alpha.position import Position
 from alpha.error import Error
 from alpha.utils import tools, logger
+from alpha.utils.journal import journal
 from alpha.tasks import SingleTask, LoopRunTask
 from alpha.const import HUOBI_USDT_SWAP
 from alpha.utils.websocket import Websocket
 from alpha.utils.request import AsyncHttpRequests
 from alpha.utils.decorator import async_method_locker
+from alpha.utils.batch import batch_request
 from alpha.order import ORDER_ACTION_BUY, ORDER_ACTION_SELL
 from alpha.order import ORDER_TYPE_LIMIT, ORDER_TYPE_MARKET, ORDER_TYPE_MAKER, ORDER_TYPE_FOK, ORDER_TYPE_IOC
 from alpha.order import ORDER_STATUS_SUBMITTED, ORDER_STATUS_PARTIAL_FILLED, ORDER_STATUS_FILLED, \
     ORDER_STATUS_CANCELED, ORDER_STATUS_FAILED, TRADE_TYPE_BUY_OPEN, TRADE_TYPE_SELL_OPEN, TRADE_TYPE_BUY_CLOSE, \
     TRADE_TYPE_SELL_CLOSE
 from .huobi_usdt_swap_api import HuobiUsdtSwapRestAPI
+from .huobi_rest_client import HuobiSigner, hostname, merge_batch_orders, merge_batch_revokes
 
 
 __all__ = ("HuobiUsdtSwapTrade", )
@@ -100,6 +93,7 @@ class HuobiUsdtSwapTrade(Websocket):
         self._wss = kwargs["wss"]
         self._access_key = kwargs["access_key"]
         self._secret_key = kwargs["secret_key"]
+        self._signer = HuobiSigner(self._access_key, self._secret_key)
         self._order_update_callback = kwargs.get("order_update_callback")
         self._position_update_callback = kwargs.get("position_update_callback")
         self._asset_update_callback = kwargs.get("asset_update_callback")
@@ -127,7 +121,7 @@ class HuobiUsdtSwapTrade(Websocket):
 
     @property
     def assets(self):
-        return copy.copy(self._assets)
+        return self._assets
 
     @property
     def orders(self):
@@ -135,7 +129,7 @@ class HuobiUsdtSwapTrade(Websocket):
 
     @property
     def position(self):
-        return copy.copy(self._position)
+        return self._position
 
     @property
     def rest_api(self):
@@ -146,35 +140,14 @@ class HuobiUsdtSwapTrade(Websocket):
         if not self.ws:
             logger.error("Websocket connection not yeah!", caller=self)
             return
-        await self.ws.send_json(data)
+        await self.send_json(data)
 
     async def connected_callback(self):
         """After connect to Websocket server successfully, send a auth message to server."""
-        timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
-        data = {
-            "AccessKeyId": self._access_key,
-            "SignatureMethod": "HmacSHA256",
-            "SignatureVersion": "2",
-            "Timestamp": timestamp
-        }
-        sign = self.generate_signature("GET", data, "/linear-swap-notification")
+        data = self._signer.sign("GET", hostname(self._wss), "/linear-swap-notification")
         data["op"] = "auth"
         data["type"] = "api"
-        data["Signature"] = sign
-        await self.ws.send_json(data)
-    
-    def generate_signature(self, method, params, request_path):
-        host_url = urllib.parse.urlparse(self._wss).hostname.lower()
-        sorted_params = sorted(params.items(), key=lambda d: d[0], reverse=False)
-        encode_params = urllib.parse.urlencode(sorted_params)
-        payload = [method, host_url, request_path, encode_params]
-        payload = "\n".join(payload)
-        payload = payload.encode(encoding="UTF8")
-        secret_key = self._secret_key.encode(encoding="utf8")
-        digest = hmac.new(secret_key, payload, digestmod=hashlib.sha256).digest()
-        signature = base64.b64encode(digest)
-        signature = signature.decode()
-        return signature
+        await self.send_json(data)
 
     async def auth_callback(self, data):
         if data["err-code"] != 0:
@@ -192,7 +165,7 @@ class HuobiUsdtSwapTrade(Websocket):
             "cid": tools.get_uuid1(),
             "topic": self._order_channel
         }
-        await self.ws.send_json(data)
+        await self.send_json(data)
 
         # subscribe position
         data = {
@@ -200,7 +173,7 @@ class HuobiUsdtSwapTrade(Websocket):
             "cid": tools.get_uuid1(),
             "topic": self._position_channel
         }
-        await self.ws.send_json(data)
+        await self.send_json(data)
 
         # subscribe asset
         data = {
@@ -208,7 +181,7 @@ class HuobiUsdtSwapTrade(Websocket):
             "cid": tools.get_uuid1(),
             "topic": self._asset_channel
         }
-        await self.ws.send_json(data)
+        await self.send_json(data)
 
     async def sub_callback(self, data):
         if data["err-code"] != 0:
@@ -243,13 +216,13 @@ class HuobiUsdtSwapTrade(Websocket):
         """ 处理websocket上接收到的消息
         @param raw 原始的压缩数据
         """
-        data = json.loads(gzip.decompress(raw).decode())
+        data = await self.decode_gzip(raw)
         logger.debug("data:", data, caller=self)
 
         op = data.get("op")
         if op == "ping":
             hb_msg = {"op": "pong", "ts": data.get("ts")}
-            await self.ws.send_json(hb_msg)
+            await self.send_json(hb_msg)
 
         elif op == "auth":
             await self.auth_callback(data)
@@ -334,10 +307,15 @@ class HuobiUsdtSwapTrade(Websocket):
                 order_type: Order type, LIMIT or MARKET.
                 lever_rate: leverage.
             kwargs:
-                
+                batch_size: Max orders in a batch request, default is 10, orders are split into batches sent
+                    concurrently.
+
         Returns:
-            success: order info  if created successfully.
-            error: erros information.
+            success: Order ids of created orders in input order, `{"index": {index: order_id, ... },
+                "client_order_id": {client_order_id: order_id, ... }}`, `index` is the index in `orders` (start from
+                1), orders without `client_order_id` are only in the index map.
+            error: Error list of failed orders in input order, `index` is the index in `orders` (start from 1), or
+                the error of the request if all requests failed.
         """
         orders_data = []
         for order in orders:
@@ -382,11 +360,15 @@ class HuobiUsdtSwapTrade(Websocket):
                     "client_order_id": client_order_id, "price": order["price"], "volume": quantity, "direction": direction, "offset": offset, \
                     "leverRate": lever_rate, "orderPriceType":  order_price_type})
 
-        result, error = await self._rest_api.create_orders({"orders_data": orders_data})
-        if error:
-            return None, error
-        order_nos = [ order["order_id"] for order in result.get("data").get("success")]
-        return order_nos, result.get("data").get("errors")
+        if not orders_data:
+            return {"index": {}, "client_order_id": {}}, None
+        # The exchange accepts at most 10 orders in a request, chunks are sent concurrently.
+        results = await batch_request(lambda chunk: self._rest_api.create_orders({"orders_data": chunk}),
+                                      orders_data, kwargs.get("batch_size", 10))
+        if all(error for _, _, _, error in results):
+            return None, results[0][3]
+        success, errors = merge_batch_orders(results)
+        return success, errors
         
     async def revoke_order(self, *order_nos):
         """ Revoke (an) order(s).
@@ -394,7 +376,8 @@ class HuobiUsdtSwapTrade(Websocket):
         Args:
             order_nos: Order id list, you can set this param to 0 or multiple items. If you set 0 param, you can cancel
                 all orders for this symbol(initialized in Trade object). If you set 1 param, you can cancel an order.
-                If you set multiple param, you can cancel multiple orders. Do not set param length more than 100.
+                If you set multiple param, you can cancel multiple orders in one request. Do not set param length more
+                than 10, use `revoke_orders` to cancel any number of orders and get the result of every order.
 
         Returns:
             Success or error, see bellow.
@@ -427,6 +410,38 @@ class HuobiUsdtSwapTrade(Websocket):
                 return False, success["errors"]
             return success, error
 
+    async def revoke_orders(self, order_nos=None, client_order_ids=None, **kwargs):
+        """ Revoke any number of orders by order ids and/or client order ids.
+
+        Args:
+            order_nos: Order id list.
+            client_order_ids: Client order id list.
+            kwargs:
+                batch_size: Max ids in a cancel request, default is 10, ids are split into requests sent concurrently.
+                cancel_all: Revoke all orders of this symbol by one request instead, if more than one request is
+                    needed and `order_nos` contains every open order, default is False. Orders placed but not
+                    reported by websocket yet are revoked too, only enable it if no order is being placed.
+
+        Returns:
+            success: `{id: error, ... }` of every id in input order, error is None if the order is cancelled.
+            error: `{id: error, ... }` of orders failed to cancel, None if all orders are cancelled.
+        """
+        order_nos = [str(order_no) for order_no in order_nos or []]
+        client_order_ids = [str(client_order_id) for client_order_id in client_order_ids or []]
+        batch_size = kwargs.get("batch_size", 10)
+        if kwargs.get("cancel_all") and not client_order_ids and len(order_nos) > batch_size \
+                and self._orders and set(self._orders).issubset(order_nos):
+            success, error = await self._rest_api.revoke_order_all(self._symbol)
+            results = [(0, order_nos, success, error)]
+        else:
+            results = await asyncio.gather(
+                batch_request(lambda chunk: self._rest_api.revoke_orders(self._symbol, chunk), order_nos, batch_size),
+                batch_request(lambda chunk: self._rest_api.revoke_orders(self._symbol, client_order_ids=chunk),
+                              client_order_ids, batch_size))
+            results = results[0] + results[1]
+        success, error = merge_batch_revokes(results)
+        return success, error
+
     async def get_open_order_nos(self):
         """ Get open order id list.
 
@@ -488,24 +503,25 @@ class HuobiUsdtSwapTrade(Websocket):
             self._orders[order_no] = order
 
         if status in [1, 2, 3]:
-            order.status = ORDER_STATUS_SUBMITTED
+            order_status, remain = ORDER_STATUS_SUBMITTED, order.remain
         elif status == 4:
-            order.status = ORDER_STATUS_PARTIAL_FILLED
-            order.remain = int(order.quantity) - int(order_info["trade_volume"])
+            order_status = ORDER_STATUS_PARTIAL_FILLED
+            remain = int(order.quantity) - int(order_info["trade_volume"])
         elif status == 6:
-            order.status = ORDER_STATUS_FILLED
-            order.remain = 0
+            order_status, remain = ORDER_STATUS_FILLED, 0
         elif status in [5, 7]:
-            order.status = ORDER_STATUS_CANCELED
-            order.remain = int(order.quantity) - int(order_info["trade_volume"])
+            order_status = ORDER_STATUS_CANCELED
+            remain = int(order.quantity) - int(order_info["trade_volume"])
         else:
             return
 
-        order.avg_price = order_info["trade_avg_price"]
-        order.ctime = order_info["created_at"]
-        order.utime = order_info["ts"]
+        # Published orders are shared with callbacks, so every update creates a new order object.
+        order = order.replace(status=order_status, remain=remain, avg_price=order_info["trade_avg_price"],
+                              ctime=order_info["created_at"], utime=order_info["ts"])
+        self._orders[order_no] = order
 
-        SingleTask.run(self._order_update_callback, copy.copy(order))
+        journal.record("order", order, order_info["ts"])
+        SingleTask.run(self._order_update_callback, order)
 
         # Delete order that already completed.
         if order.status in [ORDER_STATUS_FAILED, ORDER_STATUS_CANCELED, ORDER_STATUS_FILLED]:
@@ -527,14 +543,13 @@ class HuobiUsdtSwapTrade(Websocket):
             if position_info["contract_code"] != self._symbol:
                 continue
             if position_info["direction"] == "buy":
-                self._position.long_quantity = int(position_info["volume"])
-                self._position.long_avg_price = position_info["cost_open"]
+                self._position = self._position.replace(long_quantity=int(position_info["volume"]),
+                                                        long_avg_price=position_info["cost_open"], utime=data["ts"])
             else:
-                self._position.short_quantity = int(position_info["volume"])
-                self._position.short_avg_price = position_info["cost_open"]
-            # self._position.liquid_price = None
-            self._position.utime = data["ts"]
-            SingleTask.run(self._position_update_callback, copy.copy(self._position))
+                self._position = self._position.replace(short_quantity=int(position_info["volume"]),
+                                                        short_avg_price=position_info["cost_open"], utime=data["ts"])
+            journal.record("position", self._position, data["ts"])
+            SingleTask.run(self._position_update_callback, self._position)
     
     def _update_asset(self, data):
         """ Asset update.
@@ -571,11 +586,13 @@ class HuobiUsdtSwapTrade(Websocket):
             }
             asset = Asset(**info)
             self._assets = asset
-            SingleTask.run(self._asset_update_callback, copy.copy(self._assets))
+            journal.record("asset", self._assets, data.get("ts"))
+            SingleTask.run(self._asset_update_callback, self._assets)
         else:
-            for symbol in assets:
-                self._assets.assets.update({
-                    symbol: assets[symbol]
-                    })
-            self._assets.timestamp = tools.get_cur_timestamp_ms()
-            SingleTask.run(self._asset_update_callback, copy.copy(self._assets))
+            # Published assets are shared with callbacks, so every update creates a new asset object.
+            merged = dict(self._assets.assets)
+            merged.update(assets)
+            self._assets = Asset(self._platform, self._account, merged, tools.get_cur_timestamp_ms(),
+                                 self._assets.update)
+            journal.record("asset", self._assets, data.get("ts"))
+            SingleTask.run(self._asset_update_callback, self._assets)
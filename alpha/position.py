@@ -12,8 +12,15 @@ from alpha.utils import tools
 
 class Position:
     """ 持仓对象
+
+    * NOTE: 推送给回调函数的持仓对象是共享的，不要修改，使用 `replace` 得到更新后的对象。
     """
 
+    __slots__ = ("platform", "account", "strategy", "symbol", "leverage", "short_quantity", "short_avg_price",
+                 "short_pnl_ratio", "short_pnl_unreal", "short_pnl", "long_quantity", "long_avg_price",
+                 "long_pnl_ratio", "long_pnl_unreal", "long_pnl", "long_pos_margin", "short_pos_margin",
+                 "liquid_price", "maint_margin_ratio", "utime")
+
     def __init__(self, platform=None, account=None, strategy=None, symbol=None, leverage=None,\
         short_quantity=None, short_avg_price=None, short_pnl_ratio=None, short_pnl_unreal=None,\
            short_pnl=None, long_quantity=None, long_avg_price=None,  long_pnl_ratio=None, long_pnl_unreal=None,\
@@ -45,6 +52,15 @@ class Position:
         self.maint_margin_ratio = maint_margin_ratio #  保证金率
         self.utime = utime if utime else tools.get_cur_timestamp_ms()
 
+    def replace(self, **kwargs):
+        """ Return a new Position object with some fields replaced, this object is not modified. """
+        obj = Position.__new__(Position)
+        for name in self.__slots__:
+            setattr(obj, name, kwargs.pop(name) if name in kwargs else getattr(self, name))
+        if kwargs:
+            raise TypeError("Position.replace() got unexpected fields: {}".format(", ".join(sorted(kwargs))))
+        return obj
+
     def update(self, short_quantity=0, short_avg_price=0, long_quantity=0, long_avg_price=0, liquid_price=0,
                utime=None):
         self.short_quantity = short_quantity
@@ -13,6 +13,10 @@ import signal
 import asyncio
 
 from alpha.utils import logger
+from alpha.utils.journal import journal
+from alpha.utils.request import AsyncHttpRequests
+from alpha.utils.ratelimit import rate_limiter
+from alpha.tasks import SingleTask
 from alpha.config import config
 
 from alpha.const import VERSION
@@ -34,6 +38,8 @@ class Quant:
         self._get_event_loop()
         self._load_settings(config_module)
         self._init_logger()
+        self._init_journal()
+        self._init_http()
         self._get_version()
         self._do_heartbeat()
 
@@ -46,6 +52,8 @@ class Quant:
 
         logger.info("start io loop ...", caller=self)
         self.loop.run_forever()
+        journal.stop()
+        logger.stopLogger()
 
     def stop(self):
         """Stop the event loop."""
@@ -80,10 +88,34 @@ class Quant:
         name = config.log.get("name", "quant.log")
         clear = config.log.get("clear", False)
         backup_count = config.log.get("backup_count", 0)
+        async_mode = config.log.get("async", False)
+        queue_size = config.log.get("queue_size", 10000)
+        batch_size = config.log.get("batch_size", 100)
         if console:
-            logger.initLogger(level)
+            logger.initLogger(level, async_mode=async_mode, queue_size=queue_size, batch_size=batch_size)
         else:
-            logger.initLogger(level, path, name, clear, backup_count)
+            logger.initLogger(level, path, name, clear, backup_count, async_mode, queue_size, batch_size)
+
+    def _init_journal(self):
+        """Initialize event journal, disabled if no `JOURNAL` config."""
+        if not config.journal:
+            return
+        journal.start(path=config.journal.get("path", "/tmp/logs/Quant"),
+                      name=config.journal.get("name", "journal.jsonl"),
+                      max_bytes=config.journal.get("max_bytes", 100*1024*1024),
+                      interval=config.journal.get("interval", 86400),
+                      queue_size=config.journal.get("queue_size", 100000),
+                      batch_size=config.journal.get("batch_size", 500))
+
+    def _init_http(self):
+        """Initialize HTTP connection pool, warmup connections and REST rate limits."""
+        connector = {k: v for k, v in config.http.items() if k not in ("warmup", "rate_limit")}
+        AsyncHttpRequests.configure(**connector)
+        rate_limiter.configure(**config.http.get("rate_limit", {}))
+        warmup = config.http.get("warmup")
+        if warmup and warmup.get("hosts"):
+            SingleTask.run(AsyncHttpRequests.warmup, warmup["hosts"], warmup.get("connections", 2),
+                           warmup.get("interval", 10))
 
     def _do_heartbeat(self):
         """Start server heartbeat."""
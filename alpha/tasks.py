@@ -9,6 +9,9 @@ Tasks module.
 2. Register a single task to run:
     a) Create a coroutine and execute immediately.
     b) Create a coroutine and delay execute, delay time is seconds, default delay time is 0s.
+3. Register a conflating task:
+    a) At most one callback is in flight per key;
+    b) Values arrived while the callback is running are conflated, only the latest one is delivered.
 
 Author: HuangTao
 Date:   2018/04/26
@@ -18,9 +21,10 @@ Email:  huangtao@ifclover.com
 import asyncio
 import inspect
 
+from alpha.utils import logger
 from alpha.heartbeat import heartbeat
 
-__all__ = ("LoopRunTask", "SingleTask")
+__all__ = ("LoopRunTask", "SingleTask", "ConflateTask")
 
 
 class LoopRunTask(object):
@@ -78,3 +82,59 @@ class SingleTask:
             def foo(f, *args, **kwargs):
                 asyncio.get_event_loop().create_task(f(*args, **kwargs))
             asyncio.get_event_loop().call_later(delay, foo, func, *args)
+
+
+class ConflateTask:
+    """ Conflating task, deliver only the latest value to a callback.
+
+    Attributes:
+        func: Asynchronous callback function, like `async def callback(value): pass`.
+
+    * NOTE: Values are grouped by key (e.g. symbol). While the callback is running for a key, newer values replace
+            the pending one, so the callback always works on the newest value and never queues up.
+    """
+
+    def __init__(self, func):
+        if not func:
+            raise ValueError("conflate task callback error! func: {}".format(func))
+        self._func = func
+        self._running = set()  # Keys that have a callback in flight.
+        self._pending = {}  # Latest undelivered value, {key: value}.
+        self._delivered = {}  # Delivered values count, {key: count}.
+        self._conflated = {}  # Values replaced before being delivered, {key: count}.
+
+    @property
+    def stats(self):
+        """ Delivery statistics, {key: {"delivered": n, "conflated": m}}.
+        """
+        keys = set(self._delivered) | set(self._conflated)
+        return {k: {"delivered": self._delivered.get(k, 0), "conflated": self._conflated.get(k, 0)} for k in keys}
+
+    def run(self, key, value):
+        """ Deliver a value, or keep it as pending if the callback for this key is still running.
+
+        Args:
+            key: Conflation key, e.g. symbol.
+            value: The value to be delivered.
+        """
+        if key in self._running:
+            if key in self._pending:
+                self._conflated[key] = self._conflated.get(key, 0) + 1
+            self._pending[key] = value
+            return
+        self._running.add(key)
+        asyncio.get_event_loop().create_task(self._deliver(key, value))
+
+    async def _deliver(self, key, value):
+        try:
+            while True:
+                try:
+                    await self._func(value)
+                except Exception as e:
+                    logger.exception("conflate task callback error:", e, caller=self)
+                self._delivered[key] = self._delivered.get(key, 0) + 1
+                if key not in self._pending:
+                    break
+                value = self._pending.pop(key)
+        finally:
+            self._running.discard(key)
@@ -9,10 +9,13 @@ Email:  andyjoe318@gmail.com
 """
 
 import copy
+import time
+import asyncio
 
 from alpha import const
 from alpha.error import Error
 from alpha.utils import logger
+from alpha.utils.journal import journal
 from alpha.tasks import SingleTask
 from alpha.order import ORDER_TYPE_LIMIT
 from alpha.order import Order
@@ -116,11 +119,19 @@ class Trade:
         return order_no, error
     
     async def create_orders(self, orders_data, **kwargs):
-        """ Create batch order
+        """ Create batch order, orders are split into exchange sized batches sent concurrently.
+
+        Args:
+            orders_data: Order list, item is a dict of `action`, `price`, `quantity`, `order_type`, `lever_rate` and
+                optional `client_order_id`.
+            batch_size: Max orders in a batch request, default is 10.
 
         Returns:
-            orders_no:
-            error: error information.
+            orders_no: Order ids of created orders in input order, `{"index": {index: order_id, ... },
+                "client_order_id": {client_order_id: order_id, ... }}`, `index` is the index in `orders_data` (start
+                from 1), orders without `client_order_id` are only in the index map.
+            error: Error list of failed orders in input order, `index` is the index in `orders_data` (start from 1)
+                and `client_order_id` is added, or the error of the request if all requests failed.
         """
         order_nos, error = await self._t.create_orders(orders_data, **kwargs)
         return order_nos, error
@@ -132,7 +143,8 @@ class Trade:
         Args:
             order_nos: Order id list, you can set this param to 0 or multiple items. If you set 0 param, you can cancel
                 all orders for this symbol(initialized in Trade object). If you set 1 param, you can cancel an order.
-                If you set multiple param, you can cancel multiple orders. Do not set param length more than 100.
+                If you set multiple param, you can cancel multiple orders in one request. Do not set param length more
+                than 10, use `revoke_orders` to cancel any number of orders and get the result of every order.
 
         Returns:
             success: If execute successfully, return success information, otherwise it's None.
@@ -141,6 +153,91 @@ class Trade:
         success, error = await self._t.revoke_order(*order_nos)
         return success, error
 
+    async def revoke_orders(self, order_nos=None, client_order_ids=None, **kwargs):
+        """ Revoke any number of orders, ids are split into exchange sized requests sent concurrently.
+
+        Args:
+            order_nos: Order id list.
+            client_order_ids: Client order id list.
+            batch_size: Max ids in a cancel request, default is 10.
+            cancel_all: Revoke all orders of this symbol by one request instead, if more than one request is needed
+                and `order_nos` contains every open order, default is False. Orders placed but not reported by
+                websocket yet are revoked too, only enable it if no order is being placed.
+
+        Returns:
+            success: `{id: error, ... }` of every id in input order, error is None if the order is cancelled.
+            error: `{id: error, ... }` of orders failed to cancel, None if all orders are cancelled.
+        """
+        success, error = await self._t.revoke_orders(order_nos, client_order_ids, **kwargs)
+        return success, error
+
+    async def replace_orders(self, old_ids, new_orders, safe=False, max_open_quantity=None, **kwargs):
+        """ Replace (requote) orders, revoke old orders and create new orders.
+
+        Args:
+            old_ids: Order id list to be revoked.
+            new_orders: Order list to be created, see `create_orders`.
+            safe: Cancel first mode, create new orders after all old orders are revoked, new orders are not created if
+                any old order failed to revoke. Otherwise revoke and create concurrently, default is False.
+            max_open_quantity: Max open quantity of each side (BUY / SELL) while replacing. If remaining quantity of
+                old orders plus quantity of new orders exceeds it, cancel first mode is used. None means no limit.
+                Only old orders tracked in `orders` are counted.
+            kwargs: Params of `create_orders`, e.g. `batch_size`.
+
+        Returns:
+            success: Results, `{"mode": "concurrent" or "cancel_first", "revoked": {id: error, ... },
+                "created": {"index": {index: order_id, ... }, "client_order_id": {client_order_id: order_id, ... }},
+                "latency": milliseconds}`, see `create_orders`.
+            error: `{"revoke": errors, "create": errors}` if any order failed to revoke or create, otherwise None.
+
+        * NOTE: Concurrent mode never falls back to revoke all orders, which would revoke the new orders too.
+        """
+        old_ids = list(old_ids or [])
+        new_orders = list(new_orders or [])
+        if not safe and max_open_quantity is not None:
+            exposure = {}
+            orders = self._t.orders
+            for order_no in old_ids:
+                # Orders not tracked any more are filled or revoked, they have no open quantity.
+                order = orders.get(str(order_no))
+                if order:
+                    exposure[order.action] = exposure.get(order.action, 0) + abs(float(order.remain))
+            for order in new_orders:
+                exposure[order["action"]] = exposure.get(order["action"], 0) + abs(float(order["quantity"]))
+            safe = any(quantity > max_open_quantity for quantity in exposure.values())
+
+        start = time.monotonic()
+        revoked, revoke_error, created, create_error = {}, None, None, None
+        if safe:
+            if old_ids:
+                revoked, revoke_error = await self._t.revoke_orders(old_ids)
+            if new_orders and not revoke_error:
+                created, create_error = await self._t.create_orders(new_orders, **kwargs)
+        else:
+            revoke = self._t.revoke_orders(old_ids) if old_ids else None
+            create = self._t.create_orders(new_orders, **kwargs) if new_orders else None
+            results = await asyncio.gather(*[task for task in (revoke, create) if task])
+            if revoke:
+                revoked, revoke_error = results.pop(0)
+            if create:
+                created, create_error = results.pop(0)
+        latency = round((time.monotonic() - start) * 1000, 3)
+
+        success = {
+            "mode": "cancel_first" if safe else "concurrent",
+            "revoked": revoked,
+            "created": created or {"index": {}, "client_order_id": {}},
+            "latency": latency
+        }
+        journal.record("replace", {"mode": success["mode"], "revoke": len(old_ids), "create": len(new_orders),
+                                   "revoke_failed": len(revoke_error or {}), "create_failed": bool(create_error),
+                                   "latency": latency})
+        logger.info("replace orders, mode:", success["mode"], "revoke:", len(old_ids), "create:", len(new_orders),
+                    "latency:", latency, "ms", caller=self)
+        if revoke_error or create_error:
+            return success, {"revoke": revoke_error, "create": create_error}
+        return success, None
+
     async def get_open_order_nos(self):
         """ Get open order id list.
 
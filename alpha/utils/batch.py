@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+
+"""
+Split a batch request into exchange sized chunks and send the chunks concurrently.
+
+Usage:
+    results = await batch_request(lambda chunk: rest_api.create_orders({"orders_data": chunk}), orders_data, 10)
+    for offset, chunk, success, error in results:
+        ...
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import asyncio
+
+__all__ = ("chunks", "batch_request")
+
+
+def chunks(items, size):
+    """ Split a list into lists of at most `size` items. """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def batch_request(func, items, size, concurrency=0):
+    """ Call `func` for every chunk of `items` concurrently.
+
+    Args:
+        func: Asynchronous function like `func(chunk)` returns (success, error).
+        items: Item list.
+        size: Max items in a chunk.
+        concurrency: Max chunks sent concurrently, 0 means all, requests wait for the rate limiter anyway.
+
+    Returns:
+        results: [(offset, chunk, success, error), ...] in input order, `offset` is the index of the first item of
+            the chunk in `items`. An exception raised by `func` is returned as the error of its chunk.
+    """
+    parts = chunks(list(items), size)
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+    async def send(chunk):
+        if semaphore:
+            async with semaphore:
+                return await func(chunk)
+        return await func(chunk)
+
+    replies = await asyncio.gather(*[send(chunk) for chunk in parts], return_exceptions=True)
+    results = []
+    offset = 0
+    for chunk, reply in zip(parts, replies):
+        if isinstance(reply, asyncio.CancelledError):
+            raise reply
+        if isinstance(reply, Exception):
+            results.append((offset, chunk, None, reply))
+        else:
+            results.append((offset, chunk, reply[0], reply[1]))
+        offset += len(chunk)
+    return results
@@ -0,0 +1,202 @@
+# -*- coding:utf-8 -*-
+
+"""
+TTL cache of REST API results, used for reference data like contract info and price limits.
+
+Usage:
+    class HuobiSwapRestAPI:
+
+        @cached_request(ttl=3600)
+        async def get_swap_info(self, contract_code=None):
+            ...
+
+    success, error = await rest_api.get_swap_info("BTC-USD")  # Load from cache, request if missing or expired.
+    success = rest_api.get_swap_info.peek("BTC-USD")  # Synchronous read, None if not cached.
+    rest_api.get_swap_info.invalidate("BTC-USD")  # Invalidate a key, or all keys if no args.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import time
+import asyncio
+import inspect
+import functools
+from collections import OrderedDict
+
+from alpha.utils import logger
+
+__all__ = ("TTLCache", "cached_request")
+
+
+class TTLCache:
+    """ LRU cache with expire time.
+
+    Args:
+        ttl: Seconds an item is valid.
+        maxsize: Max items, the least recently used item is evicted when the cache is full.
+        refresh_ahead: Refresh an item in background when it is accessed after `ttl * refresh_ahead` seconds,
+            0 means no refresh ahead.
+    """
+
+    def __init__(self, ttl, maxsize=128, refresh_ahead=0.8):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.refresh_ahead = refresh_ahead
+        self._items = OrderedDict()  # {key: (value, loaded time), ... }
+        self._loading = {}  # {key: task, ... }
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, allow_stale=False):
+        """ Get a cached value, None if not cached or expired.
+
+        Args:
+            key: Cache key.
+            allow_stale: Return expired value instead of None.
+        """
+        item = self._items.get(key)
+        if not item:
+            return None
+        value, loaded_at = item
+        if not allow_stale and time.monotonic() - loaded_at >= self.ttl:
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def age(self, key):
+        """ Seconds since the value of key was loaded, None if not cached. """
+        item = self._items.get(key)
+        if not item:
+            return None
+        return time.monotonic() - item[1]
+
+    def set(self, key, value):
+        self._items[key] = (value, time.monotonic())
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """ Remove a key, or all keys if `key` is None. """
+        if key is None:
+            self._items.clear()
+        else:
+            self._items.pop(key, None)
+
+    async def load(self, key, loader):
+        """ Get a cached value, call `loader` if not cached or expired.
+
+        Args:
+            key: Cache key.
+            loader: Asynchronous function without params returns (success, error), only success is cached.
+
+        Returns:
+            success, error: Results of loader.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            self.refresh(key, loader)
+            return value, None
+        self.misses += 1
+        return await self._load(key, loader)
+
+    def refresh(self, key, loader):
+        """ Reload the value in background if it is older than `ttl * refresh_ahead`. """
+        if not self.refresh_ahead or key in self._loading:
+            return
+        age = self.age(key)
+        if age is not None and age >= self.ttl * self.refresh_ahead:
+            asyncio.ensure_future(self._load(key, loader))
+
+    async def _load(self, key, loader):
+        task = self._loading.get(key)
+        if not task:
+            task = asyncio.ensure_future(loader())
+            self._loading[key] = task
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        success, error = await asyncio.shield(task)
+        if error:
+            logger.warn("load cache error! key:", key, "error:", error, caller=self)
+        else:
+            self.set(key, success)
+        return success, error
+
+
+def cached_request(ttl, maxsize=128, refresh_ahead=0.8):
+    """ Cache the success results of an asynchronous REST API method, the method must return (success, error).
+
+    Args:
+        ttl: Seconds a result is valid.
+        maxsize: Max results to be cached for every API instance.
+        refresh_ahead: Refresh a result in background when it is accessed after `ttl * refresh_ahead` seconds.
+
+    The decorated method has these methods:
+        peek(*args, **kwargs): Synchronous read of a cached result (expired result is returned too), None if not
+            cached.
+        invalidate(*args, **kwargs): Remove a cached result, or all results if no args.
+        cache: The TTLCache object.
+
+    * NOTE: Cached results are shared by all callers, do not modify them.
+    """
+    def decorating_function(method):
+        return _CachedMethod(method, ttl, maxsize, refresh_ahead)
+    return decorating_function
+
+
+class _CachedMethod:
+
+    def __init__(self, method, ttl, maxsize, refresh_ahead):
+        self._method = method
+        self._name = "_cache_" + method.__name__
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._refresh_ahead = refresh_ahead
+        self._signature = inspect.signature(method)
+        functools.update_wrapper(self, method)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        cache = instance.__dict__.get(self._name)
+        if cache is None:
+            cache = TTLCache(self._ttl, self._maxsize, self._refresh_ahead)
+            instance.__dict__[self._name] = cache
+        return _BoundCachedMethod(self, instance, cache)
+
+
+class _BoundCachedMethod:
+
+    __slots__ = ("_method", "_instance", "cache")
+
+    def __init__(self, method, instance, cache):
+        self._method = method  # _CachedMethod
+        self._instance = instance
+        self.cache = cache
+
+    async def __call__(self, *args, **kwargs):
+        return await self.cache.load(self._key(args, kwargs), self._loader(args, kwargs))
+
+    def peek(self, *args, **kwargs):
+        key = self._key(args, kwargs)
+        value = self.cache.get(key, allow_stale=True)
+        if value is not None:
+            self.cache.refresh(key, self._loader(args, kwargs))
+        return value
+
+    def invalidate(self, *args, **kwargs):
+        if not args and not kwargs:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate(self._key(args, kwargs))
+
+    def _loader(self, args, kwargs):
+        return functools.partial(self._method._method, self._instance, *args, **kwargs)
+
+    def _key(self, args, kwargs):
+        """ Same key for positional and keyword arguments, e.g. f("BTC-USD") and f(contract_code="BTC-USD"). """
+        bound = self._method._signature.bind(self._instance, *args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.items())[1:]
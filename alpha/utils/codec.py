@@ -0,0 +1,87 @@
+# -*- coding:utf-8 -*-
+
+"""
+JSON codec.
+
+Use the fastest installed JSON library: orjson > ujson > json (stdlib). All of them decode from `bytes` directly,
+so callers do not need to `.decode()` the received data first.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+__all__ = ("loads", "dumps", "use", "backend")
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _json_dumps(obj):
+    return json.dumps(obj)
+
+
+def _orjson_dumps(obj):
+    try:
+        return orjson.dumps(obj).decode()
+    except TypeError:
+        return json.dumps(obj)  # e.g. non-str dict keys.
+
+
+def _ujson_dumps(obj):
+    try:
+        return ujson.dumps(obj, ensure_ascii=False)
+    except TypeError:
+        return json.dumps(obj)
+
+
+_CODECS = {"json": (_json_loads, _json_dumps)}
+if orjson:
+    _CODECS["orjson"] = (orjson.loads, _orjson_dumps)
+if ujson:
+    _CODECS["ujson"] = (ujson.loads, _ujson_dumps)
+
+backend = None  # Name of the codec in use.
+_loads = None
+_dumps = None
+
+
+def use(name):
+    """ Switch codec.
+
+    Args:
+        name: `orjson`, `ujson` or `json`.
+    """
+    global backend, _loads, _dumps
+    if name not in _CODECS:
+        raise ValueError("json codec not installed! name: {}".format(name))
+    backend = name
+    _loads, _dumps = _CODECS[name]
+
+
+def loads(data):
+    """ Decode JSON document from `bytes` or `str`.
+    """
+    return _loads(data)
+
+
+def dumps(obj):
+    """ Encode object to JSON `str`.
+    """
+    return _dumps(obj)
+
+
+use("orjson" if orjson else "ujson" if ujson else "json")
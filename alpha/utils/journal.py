@@ -0,0 +1,197 @@
+# -*- coding:utf-8 -*-
+
+"""
+Event journal.
+
+Order/position/asset updates and REST requests are appended to a JSON-lines file, one compact record per line:
+    {"t": 1606780800000, "mono": 123456789012, "type": "order", "ets": 1606780799990, "data": {...}}
+    t: Local wall clock time, millisecond.
+    mono: Local monotonic clock, nanosecond, to measure intervals between records.
+    type: Record type, `order` / `position` / `asset` / `rest` ...
+    ets: Exchange timestamp, millisecond, null if not provided.
+    data: Record content, objects with `__slots__` (Order, Position, Asset ...) are saved as dict.
+
+Records are serialized and written by a background thread in batches, the journal file is rotated by size and time.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+
+from alpha.utils import codec
+from alpha.utils import logger
+
+__all__ = ("journal", )
+
+
+class Journal:
+    """ Event journal, disabled until `start` is called, `record` is a no-op when disabled.
+    """
+
+    _STOP = object()
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._file = None
+        self._filename = None
+        self._max_bytes = 0
+        self._interval = 0
+        self._batch_size = 0
+        self._size = 0  # Bytes written to the current file.
+        self._opened_at = 0  # Time the current file opened, time.monotonic.
+        self.dropped = 0  # Records dropped because the queue is full or they can not be serialized.
+
+    @property
+    def enabled(self):
+        return self._thread is not None
+
+    def start(self, path="/tmp/logs/Quant", name="journal.jsonl", max_bytes=100*1024*1024, interval=86400,
+              queue_size=100000, batch_size=500):
+        """ Start the journal writer.
+
+        Args:
+            path: Journal file path.
+            name: Journal file name.
+            max_bytes: Rotate the journal file when its size reaches `max_bytes`, 0 means no size limit.
+            interval: Rotate the journal file every `interval` seconds, 0 means no time limit.
+            queue_size: Max records waiting to be written, newer records are dropped when the queue is full.
+            batch_size: Max records written (and flushed) in a batch.
+        """
+        if self._thread:
+            return
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._filename = os.path.join(path, name)
+        self._max_bytes = max_bytes
+        self._interval = interval
+        self._batch_size = batch_size
+        self._queue = queue.Queue(queue_size)
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="alpha-journal-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """ Write all pending records and close the journal file.
+
+        Args:
+            timeout: Max seconds to wait for the writer thread, pending records are lost if the writer does not finish
+                in time.
+        """
+        if not self._thread:
+            return
+        thread, self._thread = self._thread, None
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("journal writer is blocked, pending records are lost.", caller=self)
+            return
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error("journal writer does not stop in time, pending records are lost.", caller=self)
+            return
+        self._file.close()
+        self._file = None
+
+    def record(self, type_, data, ets=None):
+        """ Append a record.
+
+        Args:
+            type_: Record type, e.g. `order`.
+            data: Record content, a dict or an object with `__slots__`, it must not be modified after recorded.
+            ets: Exchange timestamp, millisecond.
+        """
+        if not self._thread:
+            return
+        try:
+            self._queue.put_nowait((int(time.time() * 1000), time.monotonic_ns(), type_, ets, data))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            lines = []
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                    continue
+                line = self._dumps(item)
+                if line is not None:
+                    lines.append(line + "\n")
+            if lines:
+                try:
+                    self._write("".join(lines))
+                except Exception as e:
+                    self.dropped += len(lines)
+                    logger.error("write journal error:", e, caller=self)
+            if stop:
+                return
+
+    def _dumps(self, item):
+        """ Serialize a record, values not supported by JSON are saved as `str`, None if it still fails. """
+        t, mono, type_, ets, data = item
+        record = {"t": t, "mono": mono, "type": type_, "ets": ets, "data": self._to_dict(data)}
+        try:
+            return codec.dumps(record)
+        except Exception:
+            pass
+        try:
+            return json.dumps(record, default=str)
+        except Exception as e:
+            self.dropped += 1
+            logger.error("serialize journal record error:", e, "type:", type_, caller=self)
+            return None
+
+    def _write(self, text):
+        if self._should_rotate():
+            self._rotate()
+        self._file.write(text)
+        self._file.flush()
+        self._size += len(text.encode("utf-8"))
+
+    def _should_rotate(self):
+        if self._max_bytes and self._size >= self._max_bytes:
+            return True
+        if self._interval and time.monotonic() - self._opened_at >= self._interval:
+            return True
+        return False
+
+    def _open(self):
+        self._file = open(self._filename, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._opened_at = time.monotonic()
+
+    def _rotate(self):
+        self._file.close()
+        rotated = "{}.{}".format(self._filename, time.strftime("%Y%m%d-%H%M%S"))
+        n = 1
+        while os.path.exists(rotated):
+            rotated = "{}.{}.{}".format(self._filename, time.strftime("%Y%m%d-%H%M%S"), n)
+            n += 1
+        os.rename(self._filename, rotated)
+        self._open()
+
+    @staticmethod
+    def _to_dict(data):
+        slots = getattr(data, "__slots__", None)
+        if slots is None:
+            return data
+        return {name: getattr(data, name) for name in slots}
+
+
+journal = Journal()
+atexit.register(journal.stop)
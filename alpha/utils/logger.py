@@ -7,26 +7,69 @@ Author: HuangTao
 Date:   2018/04/08
 Update: 2018/07/16  1. 初始化日志增加参数 clear 和 backup_count；
         2018/07/19  1. 修复日志初始化的时候，clear设置为Ture，但文件不存在的异常；
+        2020/12/01  1. 先判断日志级别再格式化日志内容，增加延迟求值参数 lazy/lazy_json；
+                    2. 增加异步写日志模式，由后台线程批量写入；
 """
 
 import os
 import sys
+import queue
+import atexit
 import shutil
 import logging
+import threading
 import traceback
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler
+
+from alpha.utils import codec
 
 initialized = False
+_root = logging.getLogger()
+_writer = None  # 异步写日志线程
+
+
+class lazy:
+    """ 延迟求值的日志参数，只有日志级别打开时才会调用 func(*args, **kwargs) 并打印其返回值
+    e.g. logger.debug("data:", logger.lazy(format_data, data), caller=self)
+    """
+
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+def lazy_json(obj):
+    """ 延迟JSON序列化的日志参数，e.g. logger.debug("data:", logger.lazy_json(data), caller=self)
+    """
+    return lazy(codec.dumps, obj)
+
+
+def isEnabledFor(level):
+    """ 日志级别是否打开，用于跳过热点路径上构造日志参数的开销
+    @param level 日志级别 logging.DEBUG/logging.INFO ...
+    """
+    return _root.isEnabledFor(level)
 
 
-def initLogger(log_level="DEBUG", log_path=None, logfile_name=None, clear=False, backup_count=0):
+def initLogger(log_level="DEBUG", log_path=None, logfile_name=None, clear=False, backup_count=0, async_mode=False,
+               queue_size=10000, batch_size=100):
     """ 初始化日志输出
     @param log_level 日志级别 DEBUG/INFO
     @param log_path 日志输出路径
     @param logfile_name 日志文件名
     @param clear 初始化的时候，是否清理之前的日志文件
     @param backup_count 保存按天分割的日志文件个数，默认0为永久保存所有日志文件
+    @param async_mode 是否异步写日志，日志先放入队列，由后台线程写入文件/控制台，不阻塞事件循环
+    @param queue_size 异步写日志的队列长度，队列满时丢弃新的日志并计数
+    @param batch_size 异步写日志时，后台线程每批最多写入的日志条数，每批写完刷新一次
     """
+    global _writer
     logger = logging.getLogger()
     logger.setLevel(log_level)
     if logfile_name:
@@ -35,33 +78,144 @@ def initLogger(log_level="DEBUG", log_path=None, logfile_name=None, clear=False,
         if not os.path.isdir(log_path):
             os.makedirs(log_path)
         logfile = os.path.join(log_path, logfile_name)
-        handler = TimedRotatingFileHandler(logfile, "midnight", backupCount=backup_count)
+        if async_mode:
+            handler = _BatchFileHandler(logfile, "midnight", backupCount=backup_count)
+        else:
+            handler = TimedRotatingFileHandler(logfile, "midnight", backupCount=backup_count)
         print("init logger ...", logfile)
     else:
         print("init logger ...")
-        handler = logging.StreamHandler()
+        handler = _BatchStreamHandler() if async_mode else logging.StreamHandler()
     fmt_str = "%(levelname)1.1s [%(asctime)s] %(message)s"
     fmt = logging.Formatter(fmt=fmt_str, datefmt=None)
     handler.setFormatter(fmt)
-    logger.addHandler(handler)
+    if async_mode:
+        stopLogger()
+        _writer = _LogWriter(handler, queue_size, batch_size)
+        _writer.start()
+        logger.addHandler(_writer.queue_handler)
+    else:
+        logger.addHandler(handler)
+
+
+def stopLogger():
+    """ 停止异步写日志线程，写入并刷新队列中剩余的日志
+    """
+    global _writer
+    if not _writer:
+        return
+    writer, _writer = _writer, None
+    logging.getLogger().removeHandler(writer.queue_handler)
+    writer.stop()
+
+
+def getDropped():
+    """ 异步写日志时，因为队列满而被丢弃的日志条数
+    """
+    if not _writer:
+        return 0
+    return _writer.queue_handler.dropped
+
+
+class _DeferredFlush:
+    """ 每条日志写入后不刷新，由写日志线程在写完一批日志后调用 flush_now """
+
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        super().flush()
+
+
+class _BatchStreamHandler(_DeferredFlush, logging.StreamHandler):
+    pass
+
+
+class _BatchFileHandler(_DeferredFlush, TimedRotatingFileHandler):
+    pass
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """ 队列满时不阻塞调用方，丢弃日志并计数 """
+
+    def __init__(self, q):
+        super(_DroppingQueueHandler, self).__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _LogWriter(threading.Thread):
+    """ 写日志线程
+    @param handler 实际写入文件/控制台的handler
+    @param queue_size 日志队列长度
+    @param batch_size 每批最多写入的日志条数
+    """
+
+    _STOP = object()
+
+    def __init__(self, handler, queue_size, batch_size):
+        super(_LogWriter, self).__init__(name="alpha-log-writer", daemon=True)
+        self.handler = handler
+        self.batch_size = batch_size
+        self.queue = queue.Queue(queue_size)
+        self.queue_handler = _DroppingQueueHandler(self.queue)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._STOP:
+                    stop = True
+                else:
+                    self.handler.handle(record)
+            self.handler.flush_now()
+            if stop:
+                return
+
+    def stop(self):
+        self.queue.put(self._STOP)
+        self.join()
+        self.handler.close()
+
+
+atexit.register(stopLogger)
 
 
 def info(*args, **kwargs):
+    if not _root.isEnabledFor(logging.INFO):
+        return
     func_name, kwargs = _log_msg_header(*args, **kwargs)
     logging.info(_log(func_name, *args, **kwargs))
 
 
 def warn(*args, **kwargs):
+    if not _root.isEnabledFor(logging.WARNING):
+        return
     msg_header, kwargs = _log_msg_header(*args, **kwargs)
     logging.warning(_log(msg_header, *args, **kwargs))
 
 
 def debug(*args, **kwargs):
+    if not _root.isEnabledFor(logging.DEBUG):
+        return
     msg_header, kwargs = _log_msg_header(*args, **kwargs)
     logging.debug(_log(msg_header, *args, **kwargs))
 
 
 def error(*args, **kwargs):
+    if not _root.isEnabledFor(logging.ERROR):
+        return
     logging.error("*" * 60)
     msg_header, kwargs = _log_msg_header(*args, **kwargs)
     logging.error(_log(msg_header, *args, **kwargs))
@@ -69,6 +223,8 @@ def error(*args, **kwargs):
 
 
 def exception(*args, **kwargs):
+    if not _root.isEnabledFor(logging.ERROR):
+        return
     logging.error("*" * 60)
     msg_header, kwargs = _log_msg_header(*args, **kwargs)
     logging.error(_log(msg_header, *args, **kwargs))
@@ -81,6 +237,8 @@ def exception(*args, **kwargs):
 def _log(msg_header, *args, **kwargs):
     _log_msg = msg_header
     for l in args:
+        if type(l) == lazy:
+            l = l()
         if type(l) == tuple:
             ps = str(l)
         else:
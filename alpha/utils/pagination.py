@@ -0,0 +1,132 @@
+# -*- coding:utf-8 -*-
+
+"""
+Async iterators over paged REST API results.
+
+Usage:
+    async for order in rest_api.iter_open_orders("BTC-USD"):
+        ...
+
+Two kinds of paging are supported:
+    paginate: `page_index` / `page_size` pages with `total_page` in the results (contract APIs). The first page tells
+        the total pages, then up to `concurrency` following pages are fetched concurrently, items are yielded in
+        page order.
+    paginate_cursor: `from` / `fromId` cursor pages (spot APIs). The next cursor is known as soon as a page arrives,
+        so the next page is fetched while the items of the current page are consumed.
+
+Pages are requested by the REST API methods, so they wait for the rate limiter like other query requests, and
+never delay requests to place or cancel orders.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import asyncio
+
+__all__ = ("PageError", "paginate", "paginate_cursor")
+
+
+class PageError(Exception):
+    """ Raised by the iterators when a page request failed, items of the previous pages have been yielded.
+
+    Attributes:
+        error: Error information returned by the REST API method.
+        page: Page index or cursor of the failed page.
+    """
+
+    def __init__(self, error, page=None):
+        super(PageError, self).__init__("request page {} error: {}".format(page, error))
+        self.error = error
+        self.page = page
+
+
+def _get_items(success, items):
+    if callable(items):
+        return items(success) or []
+    data = success.get("data") or {}
+    return data.get(items) or []
+
+
+async def _result(task, page):
+    success, error = await task
+    if error:
+        raise PageError(error, page)
+    return success
+
+
+async def paginate(fetch, items, page_index=1, concurrency=4):
+    """ Iterate the items of all pages from `page_index`.
+
+    Args:
+        fetch: Function like `fetch(page_index)` returns a coroutine of (success, error).
+        items: Key of the item list in `success["data"]`, e.g. `orders`, or a function like `items(success)` returns
+            the item list.
+        page_index: First page index.
+        concurrency: Max pages fetched concurrently once the total pages is known, at least 1 page is fetched ahead.
+
+    Yields:
+        item: Items in page order.
+
+    Raises:
+        PageError: A page request failed.
+    """
+    success = await _result(fetch(page_index), page_index)
+    data = success.get("data")
+    total_page = data.get("total_page") if isinstance(data, dict) else None
+    window = max(concurrency, 1) if total_page else 1
+    pending = []  # [(page index, task), ...] in page order.
+    next_index = page_index + 1
+    try:
+        while True:
+            page_items = _get_items(success, items)
+            if not page_items and not total_page:
+                return
+            # Fetch the following pages before the items of this page are consumed.
+            while len(pending) < window and (total_page is None or next_index <= total_page):
+                pending.append((next_index, asyncio.ensure_future(fetch(next_index))))
+                next_index += 1
+            for item in page_items:
+                yield item
+            if not pending:
+                return
+            index, task = pending.pop(0)
+            success = await _result(task, index)
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+async def paginate_cursor(fetch, items, next_cursor, cursor=None):
+    """ Iterate the items of all pages from `cursor`.
+
+    Args:
+        fetch: Function like `fetch(cursor)` returns a coroutine of (success, error), `cursor` is None for the first
+            page.
+        items: Key of the item list in `success`, e.g. `data`, or a function like `items(success)` returns the
+            item list.
+        next_cursor: Function like `next_cursor(success, page_items)` returns the cursor of the next page, None if
+            this is the last page.
+        cursor: Cursor of the first page.
+
+    Yields:
+        item: Items in page order.
+
+    Raises:
+        PageError: A page request failed.
+    """
+    if not callable(items):
+        key = items
+        items = lambda success: success.get(key)
+    task = asyncio.ensure_future(fetch(cursor))
+    try:
+        while task:
+            success = await _result(task, cursor)
+            page_items = _get_items(success, items)
+            cursor = next_cursor(success, page_items) if page_items else None
+            task = asyncio.ensure_future(fetch(cursor)) if cursor is not None else None
+            for item in page_items:
+                yield item
+    finally:
+        if task:
+            task.cancel()
@@ -0,0 +1,182 @@
+# -*- coding:utf-8 -*-
+
+"""
+REST rate limit.
+
+Requests are classified into `trade` (place/cancel orders), `query` (other private requests) and `public`. Huobi
+limits trade and query requests of an account separately, so each account has a trade bucket and a query bucket, a
+flood of queries never delays placing or canceling orders. Public requests are limited per IP, so they share one
+bucket. Waiting trade requests are always served before waiting query requests of the same bucket. A bucket is
+corrected by the rate limit headers of the responses of its own requests, requests are queued instead of getting 429.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import re
+import time
+import heapq
+import asyncio
+
+__all__ = ("TokenBucket", "RateLimiter", "rate_limiter", "PRIORITY_TRADE", "PRIORITY_QUERY")
+
+PRIORITY_TRADE = 0
+PRIORITY_QUERY = 1
+
+# Uri of requests to place or cancel orders.
+TRADE_URI = re.compile(r"(_order|_batchorder|_cancel|_cancelall|lightning_close_position|/orders/place|"
+                       r"/batch-orders|/batchcancel|/submitcancel|/submitCancelClientOrder|/batchCancelOpenOrders)$")
+
+
+class TokenBucket:
+    """ Token bucket with priority waiting queue.
+
+    Args:
+        limit: Max requests in an interval.
+        interval: Interval, seconds.
+    """
+
+    def __init__(self, limit, interval):
+        self._limit = limit
+        self._interval = interval
+        self._tokens = limit
+        self._updated = time.monotonic()
+        self._waiters = []  # [(priority, seq, future), ...]
+        self._seq = 0
+        self._handle = None
+        self.waited = 0  # Count of requests had to wait.
+
+    @property
+    def tokens(self):
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, priority=PRIORITY_QUERY):
+        """ Wait until a request can be sent.
+
+        Args:
+            priority: PRIORITY_TRADE or PRIORITY_QUERY, smaller is served first.
+        """
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        self.waited += 1
+        self._seq += 1
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (priority, self._seq, future))
+        self._schedule()
+        await future
+
+    def update(self, limit=None, interval=None, remaining=None):
+        """ Correct the bucket with the limit reported by exchange.
+
+        Args:
+            limit: Max requests in an interval.
+            interval: Interval, seconds.
+            remaining: Remaining requests in current interval.
+        """
+        self._refill()
+        if limit and interval:
+            self._limit = limit
+            self._interval = interval
+        if remaining is not None:
+            self._tokens = min(self._tokens, remaining, self._limit)
+
+    def update_from_headers(self, headers, code=None):
+        """ Correct the bucket by response headers, both contract (`ratelimit-*`) and spot (`X-HB-RateLimit-*`)
+        headers are supported. A 429 response empties the bucket.
+        """
+        limit = headers.get("ratelimit-limit")
+        interval = headers.get("ratelimit-interval")
+        remaining = headers.get("ratelimit-remaining", headers.get("X-HB-RateLimit-Requests-Remain"))
+        try:
+            self.update(int(limit) if limit else None, int(interval) / 1000 if interval else None,
+                        int(remaining) if remaining is not None else None)
+        except ValueError:
+            pass
+        if code == 429:
+            self.update(remaining=0)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._limit, self._tokens + (now - self._updated) * self._limit / self._interval)
+        self._updated = now
+
+    def _schedule(self):
+        if not self._waiters or self._handle:
+            return
+        delay = max(1 - self._tokens, 0) * self._interval / self._limit
+        self._handle = asyncio.get_event_loop().call_later(delay, self._wakeup)
+
+    def _wakeup(self):
+        self._handle = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # Cancelled.
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+
+class RateLimiter:
+    """ Token buckets of all accounts.
+    """
+
+    def __init__(self):
+        self._limits = {PRIORITY_TRADE: (72, 3), PRIORITY_QUERY: (72, 3)}  # {priority: (limit, interval)}
+        self._public_limit = (800, 1)
+        self._buckets = {}  # {(account, priority): bucket, ...}
+        self._public = None
+
+    def configure(self, private=None, public=None, trade=None, query=None):
+        """ Set default limits, only buckets created afterwards are affected.
+
+        Args:
+            private: (limit, interval) of both trade and query requests per account.
+            public: (limit, interval) of public requests, default is 800 requests per second.
+            trade: (limit, interval) of trade requests per account, default is 72 requests per 3 seconds.
+            query: (limit, interval) of query requests per account, default is 72 requests per 3 seconds.
+        """
+        if private:
+            self._limits[PRIORITY_TRADE] = tuple(private)
+            self._limits[PRIORITY_QUERY] = tuple(private)
+        if trade:
+            self._limits[PRIORITY_TRADE] = tuple(trade)
+        if query:
+            self._limits[PRIORITY_QUERY] = tuple(query)
+        if public:
+            self._public_limit = tuple(public)
+
+    def classify(self, uri, auth):
+        """ Get request priority.
+
+        Returns:
+            priority: PRIORITY_TRADE for placing or canceling orders, otherwise PRIORITY_QUERY.
+        """
+        if auth and TRADE_URI.search(uri.split("?")[0]):
+            return PRIORITY_TRADE
+        return PRIORITY_QUERY
+
+    def bucket(self, account=None, priority=PRIORITY_QUERY):
+        """ Get the token bucket of an account and request class, or the public bucket if `account` is None, pass it
+        to `AsyncHttpRequests.fetch` as `rate_limit` with the same priority.
+
+        Args:
+            account: Account ACCESS KEY, None for public requests.
+            priority: Request class from `classify`, PRIORITY_TRADE or PRIORITY_QUERY.
+        """
+        if account is None:
+            if not self._public:
+                self._public = TokenBucket(*self._public_limit)
+            return self._public
+        key = (account, priority)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(*self._limits[priority])
+        return self._buckets[key]
+
+
+rate_limiter = RateLimiter()
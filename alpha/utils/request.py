@@ -1,11 +1,14 @@
 # -*- coding:utf-8 -*-
 
-import json
+import asyncio
 import aiohttp
 from urllib.parse import urlparse
 
 from alpha.utils import logger
+from alpha.utils import codec
 from alpha.config import config
+from alpha.heartbeat import heartbeat
+from alpha.utils.ratelimit import PRIORITY_QUERY
 
 
 class AsyncHttpRequests(object):
@@ -15,6 +18,72 @@ class AsyncHttpRequests(object):
     # Every domain name holds a connection session, for less system resource utilization and faster request speed.
     _SESSIONS = {}  # {"domain-name": session, ... }
 
+    # TCPConnector params of new sessions, see `configure`.
+    _CONNECTOR = {
+        "limit": 100,  # Max connections of a session.
+        "limit_per_host": 0,  # Max connections per host, 0 means no limit.
+        "keepalive_timeout": 30,  # Seconds to keep an idle connection.
+        "ttl_dns_cache": 300,  # Seconds to cache DNS results.
+    }
+    _WARMUP_TASKS = []  # Heartbeat task ids of warmup refresh.
+
+    # Identical GET requests in flight share one network request.
+    _INFLIGHT = {}  # {request key: task, ... }
+    _COALESCE_STATS = {"requests": 0, "coalesced": 0, "paths": {}}  # paths: {url path: coalesced count, ... }
+
+    @classmethod
+    def configure(cls, **kwargs):
+        """ Update TCPConnector params, only sessions created afterwards are affected.
+
+        Args:
+            kwargs:
+                limit: Max connections of a session, default is 100.
+                limit_per_host: Max connections per host, default is 0 (no limit).
+                keepalive_timeout: Seconds to keep an idle connection, default is 30.
+                ttl_dns_cache: Seconds to cache DNS results, default is 300.
+
+        * NOTE: aiohttp already sets TCP_NODELAY on every connection.
+        """
+        cls._CONNECTOR.update(kwargs)
+
+    @classmethod
+    async def warmup(cls, hosts, connections=2, interval=10):
+        """ Open keep-alive connections to hosts in advance, so the first request does not wait on DNS, TCP and
+        TLS handshakes.
+
+        Args:
+            hosts: Host url list, e.g. ["https://api.hbdm.com"].
+            connections: Connections to be opened for each host.
+            interval: Refresh the connections every `interval` seconds via heartbeat, so they are not closed by
+                keepalive timeout, 0 means no refresh. It should be less than `keepalive_timeout`.
+        """
+        await cls._warmup(hosts, connections)
+        if interval > 0:
+            task_id = heartbeat.register(cls._refresh_warmup, interval, hosts, connections)
+            cls._WARMUP_TASKS.append(task_id)
+
+    @classmethod
+    async def _refresh_warmup(cls, hosts, connections, *args, **kwargs):
+        await cls._warmup(hosts, connections)
+
+    @classmethod
+    async def _warmup(cls, hosts, connections):
+        tasks = []
+        for host in hosts:
+            session = cls._get_session(host)
+            for _ in range(connections):
+                tasks.append(cls._ping(session, host))
+        await asyncio.gather(*tasks)
+
+    @classmethod
+    async def _ping(cls, session, url):
+        """ Send a HEAD request and read the whole response, then the connection returns to the pool. """
+        try:
+            async with session.head(url, proxy=config.proxy, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                await response.read()
+        except Exception as e:
+            logger.warn("warmup error! url:", url, "error:", e, caller=cls)
+
     @classmethod
     async def fetch(cls, method, url, params=None, body=None, data=None, headers=None, timeout=30, **kwargs):
         """ Create a HTTP request.
@@ -30,6 +99,11 @@ class AsyncHttpRequests(object):
 
             kwargs:
                 proxy: HTTP proxy.
+                rate_limit: TokenBucket to wait on before sending, it is also updated by the rate limit headers of
+                    response.
+                priority: Priority in `rate_limit`, default is PRIORITY_QUERY.
+                coalesce: If identical GET requests (same url, params and headers) in flight share one network
+                    request, default is True. The shared result must not be modified.
 
         Return:
             code: HTTP response code.
@@ -40,7 +114,57 @@ class AsyncHttpRequests(object):
             HTTP request exceptions or response data parse exceptions. All the exceptions will be captured and return
             Error information.
         """
+        coalesce = kwargs.pop("coalesce", True)
+        if method != "GET" or not coalesce:
+            return await cls._fetch(method, url, params, body, data, headers, timeout, **kwargs)
+        key = cls._request_key(url, params, headers, kwargs.get("proxy"))
+        if key is None:
+            return await cls._fetch(method, url, params, body, data, headers, timeout, **kwargs)
+        stats = cls._COALESCE_STATS
+        stats["requests"] += 1
+        task = cls._INFLIGHT.get(key)
+        if task:
+            stats["coalesced"] += 1
+            path = urlparse(url).path
+            stats["paths"][path] = stats["paths"].get(path, 0) + 1
+        else:
+            # Run the request in its own task, so cancelling a waiter does not cancel the others.
+            task = asyncio.ensure_future(cls._fetch(method, url, params, body, data, headers, timeout, **kwargs))
+            cls._INFLIGHT[key] = task
+            task.add_done_callback(lambda _: cls._INFLIGHT.pop(key, None))
+        return await asyncio.shield(task)
+
+    @classmethod
+    def coalesce_stats(cls):
+        """ GET requests coalescing counters.
+
+        Returns:
+            {"requests": GET requests, "coalesced": requests served by another request in flight,
+            "paths": {url path: coalesced requests, ... }}
+        """
+        stats = cls._COALESCE_STATS
+        return {"requests": stats["requests"], "coalesced": stats["coalesced"], "paths": dict(stats["paths"])}
+
+    @classmethod
+    def _request_key(cls, url, params, headers, proxy):
+        """ Key of identical requests, None if params or headers are not hashable. """
+        try:
+            key = (url, tuple(sorted(params.items())) if params else None,
+                   tuple(sorted(headers.items())) if headers else None, proxy)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @classmethod
+    async def _fetch(cls, method, url, params=None, body=None, data=None, headers=None, timeout=30, **kwargs):
+        """ Create a HTTP request, see `fetch`.
+        """
         session = cls._get_session(url)
+        rate_limit = kwargs.pop("rate_limit", None)
+        priority = kwargs.pop("priority", PRIORITY_QUERY)
+        if rate_limit:
+            await rate_limit.acquire(priority)
         if not kwargs.get("proxy"):
             kwargs["proxy"] = config.proxy
         try:
@@ -63,17 +187,19 @@ class AsyncHttpRequests(object):
                          "data:", data, "Error:", e, caller=cls)
             return None, None, e
         code = response.status
+        if rate_limit:
+            rate_limit.update_from_headers(response.headers, code)
         if code not in (200, 201, 202, 203, 204, 205, 206):
             text = await response.text()
             logger.error("method:", method, "url:", url, "headers:", headers, "params:", params, "body:", body,
                          "data:", data, "code:", code, "result:", text, caller=cls)
             return code, None, text
         try:
-            result = await response.json()
+            result = codec.loads(await response.read())
         except:
             result = await response.text()
         logger.debug("method:", method, "url:", url, "headers:", headers, "params:", params, "body:", body,
-                     "data:", data, "code:", code, "result:", json.dumps(result), caller=cls)
+                     "data:", data, "code:", code, "result:", logger.lazy_json(result), caller=cls)
         return code, result, None
 
     @classmethod
@@ -117,6 +243,7 @@ class AsyncHttpRequests(object):
         parsed_url = urlparse(url)
         key = parsed_url.netloc or parsed_url.hostname
         if key not in cls._SESSIONS:
-            session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(**cls._CONNECTOR)
+            session = aiohttp.ClientSession(connector=connector, json_serialize=codec.dumps)
             cls._SESSIONS[key] = session
         return cls._SESSIONS[key]
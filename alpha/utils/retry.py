@@ -0,0 +1,145 @@
+# -*- coding:utf-8 -*-
+
+"""
+Asynchronous retry policy with exponential backoff, jitter and time budget.
+
+Usage:
+    policy = RetryPolicy(max_retries=3, delay=0.2)
+
+    # As a decorator of an asynchronous function returns (success, error).
+    @policy
+    async def get_position(...):
+        ...
+
+    # As a param of `Huobi*RestAPI.request`, or the default policy of a REST API client.
+    success, error = await rest_api.request("GET", uri, params, retry=policy)
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+import time
+import random
+import asyncio
+import functools
+
+import aiohttp
+
+from alpha.utils import logger
+
+__all__ = ("RetryPolicy", "is_retryable")
+
+# HTTP status codes worth retrying.
+RETRYABLE_HTTP_CODES = {429, 500, 502, 503, 504}
+
+# Huobi error codes worth retrying, temporary system errors and rate limit.
+RETRYABLE_ERROR_CODES = {
+    1000,  # System error.
+    1001,  # System not ready.
+    1002,  # Query exception.
+    1003,  # Redis operation exception.
+    1004,  # System busy.
+    1032,  # Access frequency exceeds the limit.
+    "base-system-error",
+    "system-busy",
+    "too-many-request",
+}
+
+# Exceptions worth retrying.
+RETRYABLE_EXCEPTIONS = (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+
+def is_retryable(error, code=None):
+    """ If a failed request is worth retrying.
+
+    Args:
+        error: Error returned by request, an exception, a Huobi error response or HTTP response text.
+        code: HTTP status code, None if no response.
+
+    Returns:
+        True for network errors, HTTP 429/5xx and temporary Huobi errors, otherwise False.
+    """
+    if isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    if code in RETRYABLE_HTTP_CODES:
+        return True
+    if isinstance(error, dict):
+        err_code = error.get("err_code", error.get("err-code"))
+        return err_code in RETRYABLE_ERROR_CODES
+    return False
+
+
+class RetryPolicy:
+    """ Retry policy.
+
+    Args:
+        max_retries: Max retries after the first attempt.
+        delay: Delay before the first retry, seconds.
+        backoff: Delay multiplier of every retry.
+        max_delay: Max delay of a retry, seconds.
+        jitter: Random delay in [-jitter, +jitter] of the delay, to spread retries of concurrent callers.
+        budget: Max seconds of a call including all retries, no retry is made if it would exceed the budget,
+            0 means no limit.
+        retryable: Function like `is_retryable(error, code)` decides if an error is worth retrying.
+        retry_trade: If requests to place or cancel orders are retried, default is False because they are not
+            idempotent.
+    """
+
+    def __init__(self, max_retries=3, delay=0.2, backoff=2, max_delay=5, jitter=0.1, budget=10,
+                 retryable=is_retryable, retry_trade=False):
+        self.max_retries = max_retries
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.budget = budget
+        self.retryable = retryable
+        self.retry_trade = retry_trade
+
+    def get_delay(self, attempt):
+        """ Delay before retry `attempt` (start from 0), seconds. """
+        delay = min(self.delay * self.backoff ** attempt, self.max_delay)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(delay, 0)
+
+    async def call(self, func, *args, **kwargs):
+        """ Call an asynchronous function and retry on retryable errors.
+
+        Args:
+            func: Asynchronous function returns (success, error), or (code, success, error) with HTTP status code.
+
+        Returns:
+            Results of the last call.
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+                error = result[-1]
+                code = result[0] if len(result) == 3 else None
+                exc = None
+            except RETRYABLE_EXCEPTIONS as e:
+                result, error, code, exc = None, e, None, e
+            if not error or attempt >= self.max_retries or not self.retryable(error, code):
+                if exc:
+                    raise exc
+                return result
+            delay = self.get_delay(attempt)
+            if self.budget and time.monotonic() - start + delay > self.budget:
+                if exc:
+                    raise exc
+                return result
+            attempt += 1
+            logger.warn("retry:", attempt, "delay:", round(delay, 3), "func:", func.__name__, "error:", error,
+                        caller=self)
+            await asyncio.sleep(delay)
+
+    def __call__(self, func):
+        """ Use as a decorator. """
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await self.call(func, *args, **kwargs)
+        return wrapper
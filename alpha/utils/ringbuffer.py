@@ -0,0 +1,137 @@
+# -*- coding:utf-8 -*-
+
+"""
+Fixed size ring buffer and read-only view, used for market history.
+
+Author: QiaoXiaofeng
+Date:   2020/12/1
+Email:  andyjoe318@gmail.com
+"""
+
+__all__ = ("RingBuffer", "RingBufferView")
+
+
+class RingBuffer:
+    """ Fixed size ring buffer, the oldest item is overwritten when the buffer is full.
+
+    Args:
+        maxlen: Max items to be kept.
+    """
+
+    def __init__(self, maxlen):
+        if not maxlen or maxlen <= 0:
+            raise ValueError("maxlen error! maxlen: {}".format(maxlen))
+        self._items = [None] * maxlen
+        self._maxlen = maxlen
+        self._start = 0  # Index of the oldest item.
+        self._size = 0
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    def append(self, item):
+        if self._size < self._maxlen:
+            self._items[(self._start + self._size) % self._maxlen] = item
+            self._size += 1
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self._maxlen
+
+    def clear(self):
+        self._items = [None] * self._maxlen
+        self._start = 0
+        self._size = 0
+
+    def view(self):
+        """ Get a read-only view, the view always reflects the latest content of this buffer. """
+        return RingBufferView(self)
+
+    def __len__(self):
+        return self._size
+
+    def _get(self, index):
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % self._maxlen]
+
+
+class RingBufferView:
+    """ Read-only view of a RingBuffer, no item is copied on access.
+
+    Items are in arrival order, index 0 is the oldest and index -1 is the latest. Slicing and `last` only copy the
+    selected items into a new list. Time range queries expect items with a millisecond `timestamp` attribute that
+    does not decrease in arrival order.
+    """
+
+    __slots__ = ("_buffer", )
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+
+    @property
+    def maxlen(self):
+        return self._buffer.maxlen
+
+    @property
+    def latest(self):
+        """ The latest item, None if empty. """
+        if not len(self._buffer):
+            return None
+        return self._buffer._get(-1)
+
+    def last(self, n):
+        """ The latest n items, from old to new. """
+        size = len(self._buffer)
+        n = min(n, size)
+        return [self._buffer._get(i) for i in range(size - n, size)]
+
+    def between(self, start=None, end=None):
+        """ Items with start <= timestamp <= end, from old to new.
+
+        Args:
+            start: Start time, millisecond, None means no lower bound.
+            end: End time, millisecond, None means no upper bound.
+        """
+        lo = 0 if start is None else self._bisect(start, False)
+        hi = len(self._buffer) if end is None else self._bisect(end, True)
+        return [self._buffer._get(i) for i in range(lo, hi)]
+
+    def since(self, start):
+        """ Items with timestamp >= start, from old to new. """
+        return self.between(start, None)
+
+    def _bisect(self, timestamp, right):
+        lo, hi = 0, len(self._buffer)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self._buffer._get(mid).timestamp
+            if ts < timestamp or (right and ts == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __bool__(self):
+        return len(self._buffer) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._buffer._get(i) for i in range(*index.indices(len(self._buffer)))]
+        return self._buffer._get(index)
+
+    def __iter__(self):
+        for i in range(len(self._buffer)):
+            yield self._buffer._get(i)
+
+    def __reversed__(self):
+        for i in range(len(self._buffer) - 1, -1, -1):
+            yield self._buffer._get(i)
+
+    def __repr__(self):
+        return "RingBufferView(len={}, maxlen={})".format(len(self._buffer), self._buffer.maxlen)
@@ -6,37 +6,185 @@ websocket接口封装
 Author: QiaoXiaofeng
 Date:   2020/01/08
 History: 1.fix method locker bug when ws is disconnected.
+         2.dispatch messages inline, optional bounded per-connection queue.
+         3.gzip decompression layer with thread pool offloading for large frames.
 """
 
-import json
+import gzip
 import time
+import zlib
 import traceback
 import aiohttp
 import asyncio
+from collections import deque
 
 from alpha.const import *
 from alpha.utils import logger
+from alpha.utils import codec
 from alpha.config import config
 from alpha.heartbeat import heartbeat
 
 from alpha.utils.decorator import METHOD_LOCKERS
 
 
+class MessageQueue:
+    """ 有界消息队列，用于在接收消息和处理消息之间做背压
+
+    Args:
+        maxsize: 队列最大长度。
+        overflow_policy: 队列满时的处理策略，WS_OVERFLOW_BLOCK / WS_OVERFLOW_DROP_OLDEST / WS_OVERFLOW_CONFLATE。
+
+    * NOTE: WS_OVERFLOW_CONFLATE 策略下，key 相同的待处理消息只保留最新一条(保持原有的排队位置)。
+            WS_OVERFLOW_DROP_OLDEST 和 WS_OVERFLOW_CONFLATE 策略下，队列满时丢弃最旧的有 key 的消息，key 为 None 的
+            消息(如 ping、逐笔成交、增量深度)不会被丢弃，没有可丢弃的消息时等待。
+    """
+
+    def __init__(self, maxsize, overflow_policy=WS_OVERFLOW_BLOCK):
+        if overflow_policy not in (WS_OVERFLOW_BLOCK, WS_OVERFLOW_DROP_OLDEST, WS_OVERFLOW_CONFLATE):
+            raise ValueError("overflow policy error! overflow_policy: {}".format(overflow_policy))
+        self._maxsize = maxsize
+        self._overflow_policy = overflow_policy
+        self._items = deque()  # 待处理消息 [[key, msg_type, data], ...]
+        self._latest = {}  # 可合并的待处理消息 {key: item}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.dropped = 0  # 队列满时被丢弃的消息数量
+        self.conflated = 0  # 被更新的消息覆盖的消息数量
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def overflow_policy(self):
+        return self._overflow_policy
+
+    async def put(self, msg_type, data, key=None):
+        """ 放入一条消息
+        @param msg_type 消息类型 aiohttp.WSMsgType
+        @param data 消息内容
+        @param key 合并消息使用的key，一般为channel
+        """
+        if self._overflow_policy == WS_OVERFLOW_CONFLATE and key is not None:
+            item = self._latest.get(key)
+            if item is not None:
+                item[1] = msg_type
+                item[2] = data
+                self.conflated += 1
+                return
+        while len(self._items) >= self._maxsize:
+            index = self._drop_index()
+            if index is None:
+                self._not_full.clear()
+                await self._not_full.wait()
+                continue
+            old = self._items[index]
+            del self._items[index]
+            if old[0] is not None:
+                self._latest.pop(old[0], None)
+            self.dropped += 1
+        item = [key, msg_type, data]
+        self._items.append(item)
+        if self._overflow_policy == WS_OVERFLOW_CONFLATE and key is not None:
+            self._latest[key] = item
+        self._not_empty.set()
+
+    def _drop_index(self):
+        """ 队列满时丢弃的消息位置，None表示不能丢弃，需要等待
+        """
+        if self._overflow_policy == WS_OVERFLOW_BLOCK:
+            return None
+        for index, item in enumerate(self._items):
+            if item[0] is not None:
+                return index
+        return None
+
+    async def get(self):
+        """ 取出一条消息
+        @return (msg_type, data)
+        """
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        key, msg_type, data = self._items.popleft()
+        if key is not None:
+            self._latest.pop(key, None)
+        self._not_full.set()
+        return msg_type, data
+
+
+class GzipDecompressor:
+    """ gzip 解压
+
+    Args:
+        offload_size: 大于等于该字节数的消息放到线程池中解压，避免阻塞事件循环，0表示不使用线程池。
+        executor: 解压使用的线程池，默认使用事件循环的默认线程池。
+
+    * NOTE: 每个消息都是一个独立的 gzip 流，直接调用 zlib.decompress(wbits=16+MAX_WBITS) 在C代码中
+            完成头部解析和解压，不再经过 gzip.decompress 的 Python 层头部解析和缓冲区拼接。
+    """
+
+    WBITS = 16 + zlib.MAX_WBITS
+
+    def __init__(self, offload_size=0, executor=None):
+        self._offload_size = offload_size
+        self._executor = executor
+
+    def decompress(self, data):
+        """ 同步解压
+        """
+        try:
+            return zlib.decompress(data, self.WBITS)
+        except zlib.error:
+            return gzip.decompress(data)  # e.g. multi-member gzip data.
+
+    async def decompress_async(self, data):
+        """ 解压，大消息放到线程池中执行
+        """
+        if self._offload_size and len(data) >= self._offload_size:
+            return await asyncio.get_event_loop().run_in_executor(self._executor, self.decompress, data)
+        return self.decompress(data)
+
+
 class Websocket:
     """ websocket接口封装
     """
 
-    def __init__(self, url, check_conn_interval=10, send_hb_interval=10):
+    def __init__(self, url, check_conn_interval=10, send_hb_interval=10, queue_size=0,
+                 overflow_policy=WS_OVERFLOW_BLOCK, decompress_offload_size=0):
         """ 初始化
         @param url 建立websocket的地址
         @param check_conn_interval 检查websocket连接时间间隔
         @param send_hb_interval 发送心跳时间间隔，如果是0就不发送心跳消息
+        @param queue_size 消息队列长度，如果是0就在接收循环中直接处理消息
+        @param overflow_policy 消息队列满时的处理策略，见 MessageQueue
+        @param decompress_offload_size 大于等于该字节数的 gzip 消息放到线程池中解压，0表示不使用线程池
         """
         self._url = url
         self._check_conn_interval = check_conn_interval
         self._send_hb_interval = send_hb_interval
         self.ws = None  # websocket连接对象
         self.heartbeat_msg = None  # 心跳消息
+        self._queue = MessageQueue(queue_size, overflow_policy) if queue_size else None  # 消息队列
+        self._decompressor = GzipDecompressor(decompress_offload_size)
+        self._decompress_stats = {}  # 解压耗时统计 {channel: [count, bytes, total_seconds, max_seconds]}
+
+    @property
+    def dispatch_stats(self):
+        """ 消息队列统计信息
+        """
+        if not self._queue:
+            return {"pending": 0, "dropped": 0, "conflated": 0}
+        return {"pending": len(self._queue), "dropped": self._queue.dropped, "conflated": self._queue.conflated}
+
+    @property
+    def decompress_stats(self):
+        """ 解压耗时统计，{channel: {"count": n, "bytes": n, "total_ms": t, "max_ms": t}}
+        """
+        stats = {}
+        for channel, (count, size, total, most) in self._decompress_stats.items():
+            stats[channel] = {"count": count, "bytes": size, "total_ms": total * 1000, "max_ms": most * 1000}
+        return stats
 
     def initialize(self):
         """ 初始化
@@ -46,6 +194,9 @@ class Websocket:
         # 注册服务 发送心跳
         if self._send_hb_interval > 0:
             heartbeat.register(self._send_heartbeat_msg, self._send_hb_interval)
+        # 启动消息处理协程
+        if self._queue:
+            asyncio.get_event_loop().create_task(self._consume())
         # 建立websocket连接
         asyncio.get_event_loop().create_task(self._connect())
 
@@ -80,12 +231,12 @@ class Websocket:
         async for msg in self.ws:
             if msg.type == aiohttp.WSMsgType.TEXT:
                 try:
-                    data = json.loads(msg.data)
+                    data = codec.loads(msg.data)
                 except:
                     data = msg.data
-                await asyncio.get_event_loop().create_task(self.process(data))
+                await self._dispatch(msg.type, data)
             elif msg.type == aiohttp.WSMsgType.BINARY:
-                await asyncio.get_event_loop().create_task(self.process_binary(msg.data))
+                await self._dispatch(msg.type, msg.data)
             elif msg.type == aiohttp.WSMsgType.CLOSED:
                 logger.warn("receive event CLOSED:", msg, caller=self)
                 await asyncio.get_event_loop().create_task(self._reconnect())
@@ -101,6 +252,72 @@ class Websocket:
             else:
                 logger.warn("unhandled msg:", msg, caller=self)
 
+    async def decode_gzip(self, msg):
+        """ 解压并解码 gzip 压缩的 json 消息，按消息的 ch/topic 统计解压耗时
+        """
+        start = time.perf_counter()
+        raw = await self._decompressor.decompress_async(msg)
+        elapsed = time.perf_counter() - start
+        data = codec.loads(raw)
+        channel = (data.get("ch") or data.get("topic") or data.get("op") or "-") if isinstance(data, dict) else "-"
+        stat = self._decompress_stats.get(channel)
+        if not stat:
+            stat = self._decompress_stats[channel] = [0, 0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += len(msg)
+        stat[2] += elapsed
+        if elapsed > stat[3]:
+            stat[3] = elapsed
+        return data
+
+    async def send_json(self, data):
+        """ 发送 json 消息，使用 alpha.utils.codec 编码
+        """
+        await self.ws.send_json(data, dumps=codec.dumps)
+
+    async def _dispatch(self, msg_type, data):
+        """ 分发消息，没有消息队列时直接调用处理函数，否则放入消息队列
+        """
+        if not self._queue:
+            await self._process_message(msg_type, data)
+            return
+        if msg_type == aiohttp.WSMsgType.BINARY and self._queue.overflow_policy != WS_OVERFLOW_BLOCK:
+            # 丢弃和合并需要知道消息所属的channel，如果子类支持解码，在放入队列前解码
+            decoded = await self.decode_binary(data)
+            if decoded is not None:
+                msg_type, data = aiohttp.WSMsgType.TEXT, decoded
+        await self._queue.put(msg_type, data, self.conflate_key(msg_type, data))
+
+    async def _process_message(self, msg_type, data):
+        if msg_type == aiohttp.WSMsgType.BINARY:
+            await self.process_binary(data)
+        else:
+            await self.process(data)
+
+    async def _consume(self):
+        """ 从消息队列中取出消息并处理
+        """
+        while True:
+            msg_type, data = await self._queue.get()
+            try:
+                await self._process_message(msg_type, data)
+            except Exception as e:
+                logger.exception("process message error:", e, caller=self)
+
+    async def decode_binary(self, msg):
+        """ 解码 binary 类型的消息，返回None表示不支持在处理前解码
+        * NOTE: 子类继承实现，解码后的消息交给 process 处理
+        """
+        return None
+
+    def conflate_key(self, msg_type, data):
+        """ 消息合并使用的key，返回None表示该消息不参与合并，队列满时也不会被丢弃
+        * NOTE: 默认使用 text 消息中的 ch/topic 字段，子类可以继承实现
+        """
+        if isinstance(data, dict):
+            return data.get("ch") or data.get("topic")
+        return None
+
     async def process(self, msg):
         """ 处理websocket上接收到的消息 text 类型
         * NOTE: 子类继承实现
@@ -133,7 +350,7 @@ class Websocket:
         if self.heartbeat_msg:
             try:
                 if isinstance(self.heartbeat_msg, dict):
-                    await self.ws.send_json(self.heartbeat_msg)
+                    await self.send_json(self.heartbeat_msg)
                 elif isinstance(self.heartbeat_msg, str):
                     await self.ws.send_str(self.heartbeat_msg)
                 else:
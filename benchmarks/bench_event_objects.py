@@ -0,0 +1,122 @@
+# -*- coding:utf-8 -*-
+
+"""
+Event objects micro-benchmark: dict-backed objects with per-event copy.copy vs __slots__ objects shared with
+callbacks, per 100k events.
+
+Usage:
+    python benchmarks/bench_event_objects.py
+"""
+
+import os
+import sys
+import copy
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from alpha.kline import Kline
+from alpha.order import Order, ORDER_STATUS_PARTIAL_FILLED
+
+EVENTS = 100000
+
+
+class DictKline:
+    """ Kline object before __slots__. """
+
+    def __init__(self, platform=None, symbol=None, open=None, high=None, low=None, close=None, volume=None,
+                 timestamp=None, kline_type=None):
+        self.platform = platform
+        self.symbol = symbol
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.timestamp = timestamp
+        self.kline_type = kline_type
+
+
+class DictOrder:
+    """ Order object before __slots__. """
+
+    def __init__(self, account=None, platform=None, strategy=None, order_no=None, symbol=None, action=None, price=0,
+                 quantity=0, remain=0, status=None, avg_price=0, order_type=None, trade_type=None, ctime=None,
+                 utime=None):
+        self.platform = platform
+        self.account = account
+        self.strategy = strategy
+        self.order_no = order_no
+        self.action = action
+        self.order_type = order_type
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+        self.remain = remain
+        self.status = status
+        self.avg_price = avg_price
+        self.trade_type = trade_type
+        self.ctime = ctime
+        self.utime = utime
+
+
+def kline_copy():
+    published = []
+    for i in range(EVENTS):
+        kline = DictKline("huobi_swap", "BTC-USD", "1", "2", "0.5", "1.5", "100", i, "kline")
+        published.append(copy.copy(kline))
+    return published
+
+
+def kline_shared():
+    published = []
+    for i in range(EVENTS):
+        kline = Kline("huobi_swap", "BTC-USD", "1", "2", "0.5", "1.5", "100", i, "kline")
+        published.append(kline)
+    return published
+
+
+def order_copy():
+    published = []
+    order = DictOrder("account", "huobi_swap", "strategy", "1", "BTC-USD", "BUY", "100", 10, 10, ctime=0, utime=0)
+    for i in range(EVENTS):
+        order.status = ORDER_STATUS_PARTIAL_FILLED
+        order.remain = 5
+        order.avg_price = "100"
+        order.utime = i
+        published.append(copy.copy(order))
+    return published
+
+
+def order_replace():
+    published = []
+    order = Order("account", "huobi_swap", "strategy", "1", "BTC-USD", "BUY", "100", 10, 10, ctime=0, utime=0)
+    for i in range(EVENTS):
+        order = order.replace(status=ORDER_STATUS_PARTIAL_FILLED, remain=5, avg_price="100", utime=i)
+        published.append(order)
+    return published
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    published = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del published
+    return elapsed, peak
+
+
+def main():
+    print("events: %d" % EVENTS)
+    for name, func in (("kline dict + copy.copy", kline_copy), ("kline __slots__ shared", kline_shared),
+                       ("order dict + copy.copy", order_copy), ("order __slots__ replace", order_replace)):
+        elapsed, peak = measure(func)
+        print("%-26s %8.1f ms  %8.1f KiB peak" % (name, elapsed * 1000, peak / 1024))
+
+
+if __name__ == "__main__":
+    main()
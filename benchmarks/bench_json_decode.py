@@ -0,0 +1,63 @@
+# -*- coding:utf-8 -*-
+
+"""
+Market message decode benchmark: `json.loads(gzip.decompress(msg).decode())` vs `codec.loads(gzip.decompress(msg))`
+with every installed codec backend (json / ujson / orjson).
+
+Usage:
+    python benchmarks/bench_json_decode.py
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from alpha.utils import codec
+
+MESSAGES = 2000
+LEVELS = 150
+
+
+def make_messages():
+    """ Gzip compressed depth snapshots like `market.BTC-USD.depth.step6`. """
+    messages = []
+    for i in range(MESSAGES):
+        mid = 10000 + random.random() * 100
+        tick = {
+            "mrid": i,
+            "id": i,
+            "ts": 1600000000000 + i,
+            "version": i,
+            "ch": "market.BTC-USD.depth.step6",
+            "asks": [[round(mid + 0.1 * n, 1), random.randint(1, 1000)] for n in range(1, LEVELS + 1)],
+            "bids": [[round(mid - 0.1 * n, 1), random.randint(1, 1000)] for n in range(1, LEVELS + 1)]
+        }
+        data = {"ch": "market.BTC-USD.depth.step6", "ts": 1600000000000 + i, "tick": tick}
+        messages.append(gzip.compress(json.dumps(data).encode()))
+    return messages
+
+
+def run(name, decode, messages):
+    start = time.perf_counter()
+    for msg in messages:
+        decode(msg)
+    elapsed = time.perf_counter() - start
+    print("%-32s %8.1f us/msg" % (name, elapsed / len(messages) * 1e6))
+
+
+def main():
+    messages = make_messages()
+    print("messages: %d, levels: %d, installed codecs: %s" % (MESSAGES, LEVELS, ", ".join(sorted(codec._CODECS))))
+    run("stdlib json + decode()", lambda m: json.loads(gzip.decompress(m).decode()), messages)
+    for name in sorted(codec._CODECS):
+        codec.use(name)
+        run("codec %s from bytes" % name, lambda m: codec.loads(gzip.decompress(m)), messages)
+
+
+if __name__ == "__main__":
+    main()
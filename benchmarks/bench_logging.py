@@ -0,0 +1,80 @@
+# -*- coding:utf-8 -*-
+
+"""
+Hot path logging benchmark: the per-message `logger.debug("data:", ...)` call of the market modules, eager
+(format everything, then let `logging` drop it) vs level-gated with a lazy JSON argument, at INFO level.
+
+Usage:
+    python benchmarks/bench_logging.py [recorded.jsonl]
+
+    `recorded.jsonl` is a recorded market stream, one decoded websocket message per line. Synthetic depth
+    snapshots are used if no file is given.
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from alpha.utils import codec
+from alpha.utils import logger
+
+MESSAGES = 5000
+LEVELS = 20
+
+
+class Caller:
+    pass
+
+
+def load_messages(path):
+    with open(path) as f:
+        return [codec.loads(line) for line in f if line.strip()]
+
+
+def make_messages():
+    """ Depth snapshots like `market.BTC-USD.depth.step0`. """
+    messages = []
+    for i in range(MESSAGES):
+        mid = 10000 + random.random() * 100
+        tick = {
+            "id": i,
+            "ts": 1600000000000 + i,
+            "version": i,
+            "asks": [[round(mid + 0.1 * n, 1), random.randint(1, 1000)] for n in range(1, LEVELS + 1)],
+            "bids": [[round(mid - 0.1 * n, 1), random.randint(1, 1000)] for n in range(1, LEVELS + 1)]
+        }
+        messages.append({"ch": "market.BTC-USD.depth.step0", "ts": 1600000000000 + i, "tick": tick})
+    return messages
+
+
+def eager_debug(*args, **kwargs):
+    """ logger.debug before level gating. """
+    msg_header, kwargs = logger._log_msg_header(*args, **kwargs)
+    logging.debug(logger._log(msg_header, *args, **kwargs))
+
+
+def run(name, log, messages):
+    caller = Caller()
+    start = time.perf_counter()
+    for data in messages:
+        log(data, caller)
+    elapsed = time.perf_counter() - start
+    print("%-36s %8.2f us/msg" % (name, elapsed / len(messages) * 1e6))
+
+
+def main():
+    messages = load_messages(sys.argv[1]) if len(sys.argv) > 1 else make_messages()
+    logging.getLogger().setLevel(logging.INFO)
+    print("messages: %d, log level: INFO, codec: %s" % (len(messages), codec.backend))
+    run("eager, codec.dumps(data)", lambda d, c: eager_debug("data:", codec.dumps(d), caller=c), messages)
+    run("gated, codec.dumps(data)", lambda d, c: logger.debug("data:", codec.dumps(d), caller=c), messages)
+    run("gated, logger.lazy_json(data)", lambda d, c: logger.debug("data:", logger.lazy_json(d), caller=c),
+        messages)
+
+
+if __name__ == "__main__":
+    main()
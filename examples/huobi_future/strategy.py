@@ -163,12 +163,12 @@ class MyStrategy:
             本回调所传的orderbook是最新的单次orderbook。
         """
         logger.debug("orderbook:", orderbook, caller=self)
-        if orderbook.asks:
-            self.ask1_price = float(orderbook.asks[0][0])  # 卖一价格
-            self.ask1_volume = float(orderbook.asks[0][1])  # 卖一数量
-        if orderbook.bids:
-            self.bid1_price = float(orderbook.bids[0][0])  # 买一价格
-            self.bid1_volume = float(orderbook.bids[0][1])  # 买一数量
+        if orderbook.best_ask_price is not None:
+            self.ask1_price = orderbook.best_ask_price  # 卖一价格
+            self.ask1_volume = orderbook.best_ask_quantity  # 卖一数量
+        if orderbook.best_bid_price is not None:
+            self.bid1_price = orderbook.best_bid_price  # 买一价格
+            self.bid1_volume = orderbook.best_bid_quantity  # 买一数量
         self.last_orderbook_timestamp = orderbook.timestamp
 
     async def on_event_order_update(self, order: Order):
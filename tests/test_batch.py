@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+
+"""
+batch_request and batch result merging tests.
+"""
+
+import asyncio
+
+import pytest
+
+from alpha.utils.batch import chunks, batch_request
+from alpha.platforms.huobi_rest_client import merge_batch_orders
+
+
+def test_chunks():
+    assert chunks([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert chunks([], 2) == []
+
+
+def test_batch_request():
+    running = []
+    max_running = []
+
+    async def func(chunk):
+        running.append(chunk)
+        max_running.append(len(running))
+        await asyncio.sleep(0.001 * (10 - chunk[0]))
+        running.remove(chunk)
+        if 3 in chunk:
+            raise ValueError("bad chunk")
+        if 5 in chunk:
+            return None, "error"
+        return sum(chunk), None
+
+    results = asyncio.run(batch_request(func, range(7), 2, concurrency=2))
+    assert [(offset, chunk, success) for offset, chunk, success, _ in results] == [
+        (0, [0, 1], 1), (2, [2, 3], None), (4, [4, 5], None), (6, [6], 6)]
+    assert results[0][3] is None and results[3][3] is None
+    assert isinstance(results[1][3], ValueError)
+    assert results[2][3] == "error"
+    assert max(max_running) <= 2
+
+
+def test_batch_request_cancelled():
+    async def func(chunk):
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(batch_request(func, [1, 2, 3], 2))
+
+
+def orders(*client_order_ids):
+    return [{"client_order_id": client_order_id} for client_order_id in client_order_ids]
+
+
+def test_merge_batch_orders():
+    chunk1 = orders(11, "", 13)
+    chunk2 = orders("", 15)
+    reply1 = {"status": "ok", "data": {"success": [{"index": 3, "order_id": 103}, {"index": 1, "order_id": 101}],
+                                       "errors": [{"index": 2, "err_code": 1047, "err_msg": "margin"}]}}
+    reply2 = {"status": "ok", "data": {"success": [{"index": 2, "order_id": 105}, {"index": 1, "order_id": 104}]}}
+    results = [(0, chunk1, reply1, None), (3, chunk2, reply2, None)]
+    success, errors = merge_batch_orders(results)
+    assert list(success["index"].items()) == [(1, 101), (3, 103), (4, 104), (5, 105)]
+    assert list(success["client_order_id"].items()) == [(11, 101), (13, 103), (15, 105)]
+    assert errors == [{"index": 2, "client_order_id": "", "err_code": 1047, "err_msg": "margin"}]
+
+
+def test_merge_batch_orders_index_not_mixed_with_client_order_id():
+    # Client order id 2 of the first order must not collide with the index of the second order.
+    results = [(0, orders(2, ""), {"data": {"success": [{"index": 1, "order_id": 101},
+                                                        {"index": 2, "order_id": 102}]}}, None)]
+    success, errors = merge_batch_orders(results)
+    assert success == {"index": {1: 101, 2: 102}, "client_order_id": {2: 101}} and errors == []
+
+
+def test_merge_batch_orders_failed_chunk():
+    results = [
+        (0, orders(1, 2), None, "timeout"),
+        (2, orders(3), {"data": {"success": [{"index": 1, "order_id": 103}]}}, None)
+    ]
+    success, errors = merge_batch_orders(results)
+    assert success == {"index": {3: 103}, "client_order_id": {3: 103}}
+    assert errors == [{"index": 1, "client_order_id": 1, "err_code": None, "err_msg": "timeout"},
+                      {"index": 2, "client_order_id": 2, "err_code": None, "err_msg": "timeout"}]
@@ -0,0 +1,128 @@
+# -*- coding:utf-8 -*-
+
+"""
+TTLCache and cached_request tests.
+"""
+
+import asyncio
+
+from alpha.utils import cache as cache_module
+from alpha.utils.cache import TTLCache, cached_request
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def use_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_get_expire(monkeypatch):
+    clock = use_clock(monkeypatch)
+    cache = TTLCache(10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.get("a", allow_stale=True) == 1
+
+
+def test_lru_evict():
+    cache = TTLCache(10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_invalidate():
+    cache = TTLCache(10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") == 2
+    cache.invalidate()
+    assert cache.get("b") is None
+
+
+def test_load_single_flight_and_error():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value", None
+
+    async def failed():
+        return None, "error"
+
+    async def main():
+        cache = TTLCache(10)
+        results = await asyncio.gather(*[cache.load("a", loader) for _ in range(5)])
+        assert results == [("value", None)] * 5
+        assert len(calls) == 1
+        assert await cache.load("a", loader) == ("value", None)
+        assert cache.hits == 1 and cache.misses == 5
+        assert await cache.load("b", failed) == (None, "error")
+        assert cache.get("b") is None
+
+    asyncio.run(main())
+
+
+def test_refresh_ahead(monkeypatch):
+    clock = use_clock(monkeypatch)
+    values = iter(["v1", "v2"])
+
+    async def loader():
+        return next(values), None
+
+    async def main():
+        cache = TTLCache(10, refresh_ahead=0.5)
+        assert await cache.load("a", loader) == ("v1", None)
+        clock.now += 6
+        # Stale enough to refresh in background, the cached value is returned at once.
+        assert await cache.load("a", loader) == ("v1", None)
+        await asyncio.sleep(0.01)
+        assert cache.get("a") == "v2"
+
+    asyncio.run(main())
+
+
+class API:
+
+    def __init__(self):
+        self.calls = 0
+
+    @cached_request(ttl=60)
+    async def get_info(self, contract_code=None):
+        self.calls += 1
+        return {"contract_code": contract_code}, None
+
+
+def test_cached_request():
+    async def main():
+        api = API()
+        other = API()
+        assert await api.get_info("BTC-USD") == ({"contract_code": "BTC-USD"}, None)
+        assert await api.get_info(contract_code="BTC-USD") == ({"contract_code": "BTC-USD"}, None)
+        assert api.calls == 1
+        assert api.get_info.peek("BTC-USD") == {"contract_code": "BTC-USD"}
+        assert api.get_info.peek("ETH-USD") is None
+        await other.get_info("BTC-USD")
+        assert other.calls == 1
+        api.get_info.invalidate("BTC-USD")
+        await api.get_info("BTC-USD")
+        assert api.calls == 2
+
+    asyncio.run(main())
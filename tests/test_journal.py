@@ -0,0 +1,73 @@
+# -*- coding:utf-8 -*-
+
+"""
+Journal tests.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+
+from alpha.order import Order
+from alpha.utils.journal import Journal
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_record(tmp_path):
+    journal = Journal()
+    journal.record("order", {"id": 0})  # Disabled, no-op.
+    journal.start(path=str(tmp_path), name="journal.jsonl")
+    journal.record("order", Order(order_no="1", price=100), 1606780800000)
+    journal.record("rest", {"uri": "/swap-api/v1/swap_order"})
+    journal.stop()
+    records = read_records(os.path.join(str(tmp_path), "journal.jsonl"))
+    assert [r["type"] for r in records] == ["order", "rest"]
+    assert records[0]["data"]["order_no"] == "1" and records[0]["ets"] == 1606780800000
+    assert records[1]["ets"] is None
+
+
+def test_unserializable_record(tmp_path):
+    journal = Journal()
+    journal.start(path=str(tmp_path), name="journal.jsonl")
+    journal.record("bad", {"value": object()})
+    journal.record("good", {"value": 1})
+    journal.stop()
+    records = read_records(os.path.join(str(tmp_path), "journal.jsonl"))
+    assert [r["type"] for r in records] == ["bad", "good"]
+    assert isinstance(records[0]["data"]["value"], str)
+
+
+def test_rotate_by_bytes(tmp_path):
+    journal = Journal()
+    journal.start(path=str(tmp_path), name="journal.jsonl", max_bytes=1000, batch_size=1)
+    for i in range(20):
+        journal.record("note", {"text": "成交" * 20})
+        time.sleep(0.002)
+    journal.stop()
+    names = os.listdir(str(tmp_path))
+    assert len(names) > 1
+    for name in names:
+        # A file is rotated once it reaches max_bytes, so it exceeds max_bytes by at most one batch.
+        assert os.path.getsize(os.path.join(str(tmp_path), name)) < 1000 + 200
+    total = sum(len(read_records(os.path.join(str(tmp_path), name))) for name in names)
+    assert total == 20
+
+
+def test_stop_does_not_hang_on_blocked_writer():
+    journal = Journal()
+    blocked = threading.Event()
+    journal._queue = queue.Queue(1)
+    journal._queue.put("pending")
+    journal._thread = threading.Thread(target=blocked.wait, daemon=True)
+    journal._thread.start()
+    start = time.monotonic()
+    journal.stop(timeout=0.1)
+    assert time.monotonic() - start < 1
+    assert not journal.enabled
+    blocked.set()
@@ -0,0 +1,33 @@
+# -*- coding:utf-8 -*-
+
+"""
+Order and Position tests.
+"""
+
+import pytest
+
+from alpha.order import Order
+from alpha.position import Position
+
+
+def test_order_replace():
+    order = Order(order_no="1", price=100, quantity=2)
+    new = order.replace(price=101, remain=0)
+    assert new.price == 101 and new.remain == 0
+    assert new.order_no == "1" and new.quantity == 2
+    assert order.price == 100 and order.remain == 2
+
+
+def test_order_replace_unknown_field():
+    order = Order(order_no="1", price=100, quantity=2)
+    with pytest.raises(TypeError):
+        order.replace(prcie=101)
+
+
+def test_position_replace():
+    position = Position(symbol="BTC-USD")
+    new = position.replace(long_quantity=3)
+    assert new.long_quantity == 3 and new.symbol == "BTC-USD"
+    assert position.long_quantity is None
+    with pytest.raises(TypeError):
+        position.replace(long_qty=3)
@@ -0,0 +1,73 @@
+# -*- coding:utf-8 -*-
+
+"""
+LocalOrderbook tests.
+"""
+
+import pytest
+
+from alpha.const import ORDERBOOK_TYPE_INCREMENTAL, WS_OVERFLOW_DROP_OLDEST
+from alpha.orderbook import LocalOrderbook
+from alpha.platforms.huobi_swap_market import HuobiSwapMarket
+
+
+def snapshot(version=1):
+    return {
+        "event": "snapshot",
+        "version": version,
+        "asks": [[101.0, 1], [102.0, 2], [103.0, 3]],
+        "bids": [[100.0, 1], [99.0, 2], [98.0, 3]]
+    }
+
+
+def test_ignore_updates_before_snapshot():
+    book = LocalOrderbook("huobi_swap", "BTC-USD")
+    assert book.apply({"event": "update", "version": 5, "asks": [[101.0, 1]]})
+    assert not book.synced
+    assert book.levels() == ([], [])
+
+
+def test_snapshot_and_update():
+    book = LocalOrderbook("huobi_swap", "BTC-USD")
+    assert book.apply(snapshot(), 1606780800000)
+    assert book.synced and book.version == 1 and book.timestamp == 1606780800000
+    update = {"event": "update", "version": 2, "asks": [[101.0, 0], [100.5, 4]], "bids": [[99.0, 5], [98.0, 0]]}
+    assert book.apply(update, 1606780800100)
+    asks, bids = book.levels()
+    assert asks == [[100.5, 4], [102.0, 2], [103.0, 3]]
+    assert bids == [[100.0, 1], [99.0, 5]]
+    assert book.version == 2 and book.timestamp == 1606780800100
+
+
+def test_levels_length():
+    book = LocalOrderbook()
+    book.apply(snapshot())
+    assert book.levels(2) == ([[101.0, 1], [102.0, 2]], [[100.0, 1], [99.0, 2]])
+
+
+def test_version_gap():
+    book = LocalOrderbook()
+    book.apply(snapshot())
+    assert not book.apply({"event": "update", "version": 3, "asks": [[104.0, 1]]})
+    assert not book.synced
+    assert book.levels() == ([], [])
+    # Updates are ignored until a new snapshot arrives.
+    assert book.apply({"event": "update", "version": 4, "asks": [[104.0, 1]]})
+    assert not book.synced
+    assert book.apply(snapshot(10))
+    assert book.version == 10
+    assert book.apply({"event": "update", "version": 11})
+
+
+def test_snapshot_resets_book():
+    book = LocalOrderbook()
+    book.apply(snapshot())
+    book.apply({"event": "snapshot", "version": 7, "asks": [[200.0, 1]], "bids": []})
+    assert book.levels() == ([[200.0, 1]], [])
+
+
+def test_market_rejects_lossy_queue():
+    with pytest.raises(ValueError):
+        HuobiSwapMarket(platform="huobi_swap", symbols=["BTC-USD"], channels=["orderbook"],
+                        orderbook_type=ORDERBOOK_TYPE_INCREMENTAL, queue_size=100,
+                        overflow_policy=WS_OVERFLOW_DROP_OLDEST)
@@ -0,0 +1,156 @@
+# -*- coding:utf-8 -*-
+
+"""
+paginate and paginate_cursor tests.
+"""
+
+import asyncio
+
+import pytest
+
+from alpha.utils.pagination import PageError, paginate, paginate_cursor
+from alpha.platforms.huobi_spot_api import HuobiSpotRestAPI
+
+
+class Pages:
+    """ Fake paged API, `total_page` pages of `size` items, later pages reply faster. """
+
+    def __init__(self, total_page, size=2, fail=None, total=True):
+        self.total_page = total_page
+        self.size = size
+        self.fail = fail
+        self.total = total
+        self.requested = []
+        self.cancelled = []
+        self.running = 0
+        self.max_running = 0
+
+    async def fetch(self, page_index):
+        self.requested.append(page_index)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.001 * (self.total_page - page_index + 1))
+        except asyncio.CancelledError:
+            self.cancelled.append(page_index)
+            raise
+        finally:
+            self.running -= 1
+        if page_index == self.fail:
+            return None, "page error"
+        orders = []
+        if page_index <= self.total_page:
+            orders = [page_index * 10 + i for i in range(self.size)]
+        data = {"orders": orders}
+        if self.total:
+            data["total_page"] = self.total_page
+        return {"status": "ok", "data": data}, None
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_paginate_order_and_concurrency():
+    pages = Pages(6)
+    items = asyncio.run(collect(paginate(pages.fetch, "orders", concurrency=3)))
+    assert items == [10, 11, 20, 21, 30, 31, 40, 41, 50, 51, 60, 61]
+    assert sorted(pages.requested) == [1, 2, 3, 4, 5, 6]
+    assert pages.max_running <= 3
+
+
+def test_paginate_items_function():
+    pages = Pages(2)
+    items = asyncio.run(collect(paginate(pages.fetch, lambda success: success["data"]["orders"][:1])))
+    assert items == [10, 20]
+
+
+def test_paginate_without_total_page():
+    pages = Pages(3, total=False)
+    items = asyncio.run(collect(paginate(pages.fetch, "orders", concurrency=4)))
+    assert items == [10, 11, 20, 21, 30, 31]
+    # Pages are fetched one by one until an empty page.
+    assert pages.requested == [1, 2, 3, 4] and pages.max_running == 1
+
+
+def test_paginate_page_error():
+    pages = Pages(4, fail=3)
+    items = []
+
+    async def main():
+        async for item in paginate(pages.fetch, "orders", concurrency=2):
+            items.append(item)
+
+    with pytest.raises(PageError) as exc:
+        asyncio.run(main())
+    assert exc.value.page == 3 and exc.value.error == "page error"
+    assert items == [10, 11, 20, 21]
+
+
+def test_paginate_first_page_error():
+    pages = Pages(4, fail=1)
+    with pytest.raises(PageError) as exc:
+        asyncio.run(collect(paginate(pages.fetch, "orders")))
+    assert exc.value.page == 1 and pages.requested == [1]
+
+
+def test_paginate_close_cancels_pending():
+    pages = Pages(10)
+
+    async def main():
+        iterator = paginate(pages.fetch, "orders", concurrency=3)
+        assert await iterator.__anext__() == 10
+        await asyncio.sleep(0)  # Let the following page requests start.
+        await iterator.aclose()
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert pages.requested == [1, 2, 3, 4]
+    assert sorted(pages.cancelled) == [2, 3, 4]
+
+
+def test_paginate_cursor():
+    data = {None: [5, 4], 4: [3, 2], 2: [1], 1: []}
+    requested = []
+
+    async def fetch(cursor):
+        requested.append(cursor)
+        return {"status": "ok", "data": data[cursor]}, None
+
+    iterator = paginate_cursor(fetch, "data", lambda success, page_items: page_items[-1] if len(page_items) == 2
+                               else None)
+    assert asyncio.run(collect(iterator)) == [5, 4, 3, 2, 1]
+    assert requested == [None, 4, 2]
+
+
+def test_paginate_cursor_error():
+    async def fetch(cursor):
+        if cursor:
+            return None, "cursor error"
+        return {"data": [2, 1]}, None
+
+    items = []
+
+    async def main():
+        async for item in paginate_cursor(fetch, "data", lambda success, page_items: page_items[-1]):
+            items.append(item)
+
+    with pytest.raises(PageError) as exc:
+        asyncio.run(main())
+    assert exc.value.page == 1 and items == [2, 1]
+
+
+def test_spot_iter_open_orders():
+    orders = [{"id": i} for i in range(25, 0, -1)]
+    requested = []
+
+    async def get_open_orders(account_id, symbol, side="", _from="", direct="", size=100):
+        requested.append((_from, direct))
+        start = 0 if not _from else [order["id"] for order in orders].index(_from) + 1
+        return {"status": "ok", "data": orders[start:start + size]}, None
+
+    api = object.__new__(HuobiSpotRestAPI)
+    api.get_open_orders = get_open_orders
+    items = asyncio.run(collect(api.iter_open_orders("123", "btcusdt", size=10)))
+    assert [item["id"] for item in items] == list(range(25, 0, -1))
+    assert requested == [("", "next"), (16, "next"), (6, "next")]
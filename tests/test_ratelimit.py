@@ -0,0 +1,124 @@
+# -*- coding:utf-8 -*-
+
+"""
+TokenBucket and RateLimiter tests.
+"""
+
+import asyncio
+
+from alpha.utils import ratelimit as ratelimit_module
+from alpha.utils.ratelimit import TokenBucket, RateLimiter, PRIORITY_TRADE, PRIORITY_QUERY
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def use_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit_module, "time", clock)
+    return clock
+
+
+def test_refill(monkeypatch):
+    clock = use_clock(monkeypatch)
+    bucket = TokenBucket(10, 1)
+    bucket.update(remaining=0)
+    assert bucket.tokens == 0
+    clock.now += 0.5
+    assert bucket.tokens == 5
+    clock.now += 10
+    assert bucket.tokens == 10
+
+
+def test_update_from_headers(monkeypatch):
+    use_clock(monkeypatch)
+    bucket = TokenBucket(72, 3)
+    bucket.update_from_headers({"ratelimit-limit": "144", "ratelimit-interval": "3000", "ratelimit-remaining": "50"})
+    assert bucket.tokens == 50 and bucket._limit == 144 and bucket._interval == 3
+    bucket.update_from_headers({"X-HB-RateLimit-Requests-Remain": "20"})
+    assert bucket.tokens == 20
+    bucket.update_from_headers({"ratelimit-remaining": "bad"})
+    assert bucket.tokens == 20
+    # Remaining never adds tokens.
+    bucket.update_from_headers({"ratelimit-remaining": "100"})
+    assert bucket.tokens == 20
+    bucket.update_from_headers({}, code=429)
+    assert bucket.tokens == 0
+
+
+def test_acquire_without_waiting():
+    async def main():
+        bucket = TokenBucket(3, 10)
+        for _ in range(3):
+            await bucket.acquire()
+        assert bucket.waited == 0
+
+    asyncio.run(main())
+
+
+def test_trade_served_first():
+    async def main():
+        bucket = TokenBucket(1, 0.02)
+        await bucket.acquire()
+        served = []
+
+        async def request(name, priority):
+            await bucket.acquire(priority)
+            served.append(name)
+
+        tasks = [asyncio.ensure_future(request("query1", PRIORITY_QUERY)),
+                 asyncio.ensure_future(request("query2", PRIORITY_QUERY))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(request("trade", PRIORITY_TRADE)))
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert served == ["trade", "query1", "query2"]
+        assert bucket.waited == 3
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_skipped():
+    async def main():
+        bucket = TokenBucket(1, 0.02)
+        await bucket.acquire()
+        cancelled = asyncio.ensure_future(bucket.acquire(PRIORITY_TRADE))
+        waiter = asyncio.ensure_future(bucket.acquire(PRIORITY_QUERY))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.wait_for(waiter, 1)
+        assert cancelled.cancelled() and not bucket._waiters
+
+    asyncio.run(main())
+
+
+def test_rate_limiter():
+    limiter = RateLimiter()
+    limiter.configure(private=(10, 1), trade=(20, 1))
+    assert limiter.bucket("key1") is limiter.bucket("key1", PRIORITY_QUERY)
+    assert limiter.bucket("key1") is not limiter.bucket("key2")
+    assert limiter.bucket("key1", PRIORITY_TRADE) is not limiter.bucket("key1", PRIORITY_QUERY)
+    assert limiter.bucket() is limiter.bucket(None, PRIORITY_TRADE)
+    assert limiter.bucket("key1", PRIORITY_QUERY)._limit == 10
+    assert limiter.bucket("key1", PRIORITY_TRADE)._limit == 20
+    assert limiter.classify("/swap-api/v1/swap_order", True) == PRIORITY_TRADE
+    assert limiter.classify("/v1/order/orders/place", True) == PRIORITY_TRADE
+    assert limiter.classify("/swap-api/v1/swap_cancel?a=1", True) == PRIORITY_TRADE
+    assert limiter.classify("/swap-api/v1/swap_order", False) == PRIORITY_QUERY
+    assert limiter.classify("/swap-api/v1/swap_account_info", True) == PRIORITY_QUERY
+
+
+def test_query_headers_leave_trade_bucket_alone(monkeypatch):
+    use_clock(monkeypatch)
+    limiter = RateLimiter()
+    trade = limiter.bucket("key1", limiter.classify("/swap-api/v1/swap_order", True))
+    query = limiter.bucket("key1", limiter.classify("/swap-api/v1/swap_openorders", True))
+    query.update_from_headers({"ratelimit-remaining": "0"})
+    query.update_from_headers({}, code=429)
+    assert query.tokens == 0
+    assert trade.tokens == 72
@@ -0,0 +1,78 @@
+# -*- coding:utf-8 -*-
+
+"""
+Trade.replace_orders tests.
+"""
+
+import asyncio
+
+from alpha.order import Order, ORDER_ACTION_BUY
+from alpha.trade import Trade
+
+
+class FakeTrade:
+
+    def __init__(self, orders=None, revoke_error=None):
+        self.orders = orders or {}
+        self.revoke_error = revoke_error
+        self.calls = []
+
+    async def revoke_orders(self, order_nos, client_order_ids=None, **kwargs):
+        self.calls.append(("revoke", list(order_nos), kwargs))
+        errors = {order_no: self.revoke_error for order_no in order_nos} if self.revoke_error else None
+        return {order_no: self.revoke_error for order_no in order_nos}, errors
+
+    async def create_orders(self, orders_data, **kwargs):
+        self.calls.append(("create", len(orders_data), kwargs))
+        return {"index": {i + 1: str(100 + i) for i in range(len(orders_data))},
+                "client_order_id": {order["client_order_id"]: str(100 + i) for i, order in enumerate(orders_data)
+                                    if order.get("client_order_id")}}, []
+
+
+def trader(fake):
+    t = object.__new__(Trade)
+    t._t = fake
+    return t
+
+
+def buy(quantity):
+    return {"action": ORDER_ACTION_BUY, "price": 100, "quantity": quantity, "order_type": "LIMIT", "lever_rate": 5}
+
+
+def test_concurrent():
+    fake = FakeTrade()
+    new_orders = [buy(1), dict(buy(1), client_order_id=7)]
+    success, error = asyncio.run(trader(fake).replace_orders(["1", "2"], new_orders, batch_size=5))
+    assert error is None
+    assert success["mode"] == "concurrent"
+    assert success["revoked"] == {"1": None, "2": None}
+    assert success["created"] == {"index": {1: "100", 2: "101"}, "client_order_id": {7: "101"}}
+    assert ("revoke", ["1", "2"], {}) in fake.calls and ("create", 2, {"batch_size": 5}) in fake.calls
+
+
+def test_cancel_first_on_revoke_error():
+    fake = FakeTrade(revoke_error="failed")
+    success, error = asyncio.run(trader(fake).replace_orders(["1"], [buy(1)], safe=True))
+    assert success["mode"] == "cancel_first" and success["created"] == {"index": {}, "client_order_id": {}}
+    assert error == {"revoke": {"1": "failed"}, "create": None}
+    assert [call[0] for call in fake.calls] == ["revoke"]
+
+
+def test_max_open_quantity_uses_remain():
+    # A partially filled order only counts its remaining quantity.
+    orders = {"1": Order(order_no="1", action=ORDER_ACTION_BUY, quantity=5, remain=2)}
+    success, _ = asyncio.run(trader(FakeTrade(orders)).replace_orders(["1"], [buy(3)], max_open_quantity=5))
+    assert success["mode"] == "concurrent"
+
+    # A filled order still tracked has no open quantity.
+    orders = {"1": Order(order_no="1", action=ORDER_ACTION_BUY, quantity=5).replace(remain=0)}
+    success, _ = asyncio.run(trader(FakeTrade(orders)).replace_orders(["1"], [buy(5)], max_open_quantity=5))
+    assert success["mode"] == "concurrent"
+
+    # Untracked ids are skipped.
+    success, _ = asyncio.run(trader(FakeTrade()).replace_orders(["9"], [buy(5)], max_open_quantity=5))
+    assert success["mode"] == "concurrent"
+
+    orders = {"1": Order(order_no="1", action=ORDER_ACTION_BUY, quantity=5, remain=3)}
+    success, _ = asyncio.run(trader(FakeTrade(orders)).replace_orders(["1"], [buy(3)], max_open_quantity=5))
+    assert success["mode"] == "cancel_first"
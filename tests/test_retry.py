@@ -0,0 +1,129 @@
+# -*- coding:utf-8 -*-
+
+"""
+RetryPolicy and retry decorator tests.
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from alpha.utils import retry as retry_module
+from alpha.utils.retry import RetryPolicy, is_retryable
+from alpha.utils.decorator import retry, StopRetry
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """ Record retry delays instead of sleeping. """
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", sleep)
+    return delays
+
+
+def replies(*results):
+    """ Asynchronous function returns `results` one by one, raises the exceptions. """
+    results = list(results)
+    calls = []
+
+    async def func(*args, **kwargs):
+        calls.append(args)
+        result = results.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    func.calls = calls
+    return func
+
+
+def test_is_retryable():
+    assert is_retryable(aiohttp.ClientConnectionError())
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable("Bad Gateway", 502)
+    assert is_retryable({"status": "error", "err_code": 1004})
+    assert is_retryable({"status": "error", "err-code": "too-many-request"})
+    assert not is_retryable({"status": "error", "err_code": 1047})
+    assert not is_retryable("Bad Request", 400)
+
+
+def test_no_retry_on_success(delays):
+    func = replies(("ok", None))
+    assert asyncio.run(RetryPolicy().call(func)) == ("ok", None)
+    assert len(func.calls) == 1 and delays == []
+
+
+def test_retry_until_success(delays):
+    func = replies((None, {"err_code": 1004}), (503, None, "unavailable"), ("ok", None))
+    policy = RetryPolicy(delay=0.1, backoff=2, jitter=0)
+    assert asyncio.run(policy.call(func)) == ("ok", None)
+    assert delays == [0.1, 0.2]
+
+
+def test_no_retry_on_business_error(delays):
+    func = replies((None, {"err_code": 1047}))
+    assert asyncio.run(RetryPolicy().call(func)) == (None, {"err_code": 1047})
+    assert delays == []
+
+
+def test_max_retries(delays):
+    func = replies(*[(None, {"err_code": 1004})] * 3)
+    policy = RetryPolicy(max_retries=2, delay=0.1, jitter=0)
+    assert asyncio.run(policy.call(func)) == (None, {"err_code": 1004})
+    assert len(func.calls) == 3 and len(delays) == 2
+
+
+def test_max_delay_and_jitter():
+    policy = RetryPolicy(delay=1, backoff=10, max_delay=5, jitter=0.1)
+    for attempt in range(5):
+        assert 0 <= policy.get_delay(attempt) <= 5.5
+    assert RetryPolicy(delay=1, backoff=10, max_delay=5, jitter=0).get_delay(3) == 5
+
+
+def test_budget(delays):
+    func = replies((None, {"err_code": 1004}), ("ok", None))
+    policy = RetryPolicy(delay=2, jitter=0, budget=1)
+    assert asyncio.run(policy.call(func)) == (None, {"err_code": 1004})
+    assert delays == []
+
+
+def test_exception_retried_then_raised(delays):
+    func = replies(aiohttp.ClientConnectionError(), aiohttp.ClientConnectionError())
+    policy = RetryPolicy(max_retries=1, delay=0, jitter=0)
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(policy.call(func))
+    assert len(func.calls) == 2
+
+
+def test_policy_decorator(delays):
+    func = replies((None, {"err_code": 1000}), ("ok", None))
+    policy = RetryPolicy(delay=0, jitter=0)
+    assert asyncio.run(policy(func)(1)) == ("ok", None)
+    assert func.calls == [(1, ), (1, )]
+
+
+def test_retry_decorator_per_call_state():
+    sleeps = []
+
+    def sleep(delay):
+        sleeps.append(delay)
+
+    func = replies(ValueError(), ("a", None), ValueError(), ("b", None))
+    wrapped = retry(max_retries=3, delay=1, step=1, exceptions=ValueError, sleep=sleep)(func)
+    assert asyncio.run(wrapped()) == ("a", None)
+    assert asyncio.run(wrapped()) == ("b", None)
+    # The delay starts from `delay` again in every call, no sleep after success.
+    assert sleeps == [1, 1]
+
+
+def test_retry_decorator_validate_and_raise():
+    func = replies((None, "e1"), (None, "e2"))
+    wrapped = retry(max_retries=2, validate=lambda error: error is None)(func)
+    with pytest.raises(StopRetry):
+        asyncio.run(wrapped())
+    assert len(func.calls) == 2
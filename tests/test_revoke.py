@@ -0,0 +1,94 @@
+# -*- coding:utf-8 -*-
+
+"""
+Batch cancel tests.
+"""
+
+import asyncio
+
+from alpha.platforms.huobi_rest_client import merge_batch_revokes
+from alpha.platforms.huobi_swap_trade import HuobiSwapTrade
+
+
+def test_merge_batch_revokes():
+    results = [
+        (0, ["1", "2", "3"], {"status": "ok", "data": {
+            "successes": "1,3", "errors": [{"order_id": "2", "err_code": 1071, "err_msg": "cancelled"}]}}, None),
+        (3, ["4", "5"], None, "timeout"),
+        (5, ["6"], {"status": "ok", "data": {"successes": "", "errors": []}}, None)
+    ]
+    outcomes, errors = merge_batch_revokes(results)
+    assert list(outcomes) == ["1", "2", "3", "4", "5", "6"]
+    assert outcomes["1"] is None and outcomes["3"] is None
+    assert outcomes["2"]["err_code"] == 1071
+    assert outcomes["4"] == "timeout" and outcomes["5"] == "timeout"
+    assert outcomes["6"]["err_msg"] == "order not cancelled"
+    assert list(errors) == ["2", "4", "5", "6"]
+
+
+def test_merge_batch_revokes_all_cancelled():
+    results = [(0, ["1", "2"], {"status": "ok", "data": {"successes": "1,2", "errors": []}}, None)]
+    assert merge_batch_revokes(results) == ({"1": None, "2": None}, None)
+
+
+class RestAPI:
+
+    def __init__(self):
+        self.requests = []
+
+    async def revoke_orders(self, contract_code, order_ids=[], client_order_ids=[]):
+        self.requests.append((order_ids, client_order_ids))
+        ids = order_ids or client_order_ids
+        return {"status": "ok", "data": {"successes": ",".join(ids), "errors": []}}, None
+
+    async def revoke_order_all(self, contract_code):
+        self.requests.append("all")
+        return {"status": "ok", "data": {"successes": ",".join(str(i) for i in range(12)), "errors": []}}, None
+
+
+def trade(orders=()):
+    t = object.__new__(HuobiSwapTrade)
+    t._symbol = "BTC-USD"
+    t._orders = {order_no: None for order_no in orders}
+    t._rest_api = RestAPI()
+    return t
+
+
+def test_revoke_orders_chunks():
+    t = trade()
+    order_nos = [str(i) for i in range(12)]
+    outcomes, errors = asyncio.run(t.revoke_orders(order_nos, client_order_ids=[101, 102], batch_size=5))
+    assert list(outcomes) == order_nos + ["101", "102"]
+    assert errors is None
+    assert sorted(t._rest_api.requests) == sorted([(order_nos[:5], []), (order_nos[5:10], []),
+                                                   (order_nos[10:], []), ([], ["101", "102"])])
+
+
+def test_revoke_orders_cancel_all_is_opt_in():
+    order_nos = [str(i) for i in range(12)]
+    t = trade(order_nos)
+    asyncio.run(t.revoke_orders(order_nos))
+    assert "all" not in t._rest_api.requests
+
+    t = trade(order_nos)
+    outcomes, errors = asyncio.run(t.revoke_orders(order_nos, cancel_all=True))
+    assert t._rest_api.requests == ["all"]
+    assert list(outcomes) == order_nos and errors is None
+
+    # Some tracked orders are not in `order_nos`, they must not be revoked.
+    t = trade(order_nos + ["99"])
+    asyncio.run(t.revoke_orders(order_nos, cancel_all=True))
+    assert "all" not in t._rest_api.requests
+
+    # One request is enough.
+    t = trade(order_nos[:3])
+    asyncio.run(t.revoke_orders(order_nos[:3], cancel_all=True))
+    assert t._rest_api.requests == [(order_nos[:3], [])]
+
+
+def test_revoke_order_multiple_ids():
+    t = trade()
+    success, error = asyncio.run(t.revoke_order("1", "2"))
+    # The raw reply of one request, as before `revoke_orders` was added.
+    assert success == {"status": "ok", "data": {"successes": "1,2", "errors": []}} and error is None
+    assert t._rest_api.requests == [(("1", "2"), [])]
@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+
+"""
+RingBuffer and RingBufferView tests.
+"""
+
+from collections import namedtuple
+
+import pytest
+
+from alpha.utils.ringbuffer import RingBuffer
+
+Item = namedtuple("Item", ["timestamp", "value"])
+
+
+def test_invalid_maxlen():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_append_and_overwrite():
+    buffer = RingBuffer(3)
+    view = buffer.view()
+    assert not view and view.latest is None and len(view) == 0
+    for i in range(5):
+        buffer.append(i)
+    assert len(view) == 3 and view.maxlen == 3
+    assert list(view) == [2, 3, 4]
+    assert list(reversed(view)) == [4, 3, 2]
+    assert view[0] == 2 and view[-1] == 4 and view.latest == 4
+    assert view[1:] == [3, 4] and view[::-1] == [4, 3, 2]
+    assert view.last(2) == [3, 4] and view.last(10) == [2, 3, 4] and view.last(0) == []
+    with pytest.raises(IndexError):
+        view[3]
+    with pytest.raises(IndexError):
+        view[-4]
+
+
+def test_view_reflects_buffer():
+    buffer = RingBuffer(2)
+    view = buffer.view()
+    buffer.append("a")
+    assert list(view) == ["a"]
+    buffer.append("b")
+    buffer.append("c")
+    assert list(view) == ["b", "c"]
+    buffer.clear()
+    assert list(view) == [] and view.latest is None
+
+
+def test_time_range():
+    buffer = RingBuffer(5)
+    for ts in [100, 200, 200, 300, 400, 500]:
+        buffer.append(Item(ts, ts))
+    view = buffer.view()
+    assert [item.timestamp for item in view] == [200, 200, 300, 400, 500]
+    assert [item.timestamp for item in view.between(200, 300)] == [200, 200, 300]
+    assert [item.timestamp for item in view.between(250, 450)] == [300, 400]
+    assert [item.timestamp for item in view.between(end=200)] == [200, 200]
+    assert [item.timestamp for item in view.since(400)] == [400, 500]
+    assert view.between(600) == [] and view.between(end=100) == []
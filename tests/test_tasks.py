@@ -0,0 +1,36 @@
+# -*- coding:utf-8 -*-
+
+"""
+ConflateTask tests.
+"""
+
+import asyncio
+
+import pytest
+
+from alpha.tasks import ConflateTask
+
+
+def test_no_callback():
+    with pytest.raises(ValueError):
+        ConflateTask(None)
+
+
+def test_conflate_latest_value():
+    delivered = []
+
+    async def callback(value):
+        delivered.append(value)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        task = ConflateTask(callback)
+        for i in range(5):
+            task.run("BTC-USD", i)
+        task.run("ETH-USD", 10)
+        await asyncio.sleep(0.05)
+        return task.stats
+
+    stats = asyncio.run(main())
+    assert delivered == [0, 10, 4]
+    assert stats == {"BTC-USD": {"delivered": 2, "conflated": 3}, "ETH-USD": {"delivered": 1, "conflated": 0}}
@@ -0,0 +1,119 @@
+# -*- coding:utf-8 -*-
+
+"""
+Websocket MessageQueue tests.
+"""
+
+import asyncio
+
+import pytest
+
+from alpha.const import WS_OVERFLOW_BLOCK, WS_OVERFLOW_DROP_OLDEST, WS_OVERFLOW_CONFLATE
+from alpha.utils.websocket import MessageQueue
+from alpha.platforms.huobi_swap_market import HuobiSwapMarket
+
+
+async def drain(queue):
+    items = []
+    while len(queue):
+        items.append(await queue.get())
+    return items
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        MessageQueue(10, "unknown")
+
+
+def test_drop_oldest():
+    async def main():
+        queue = MessageQueue(2, WS_OVERFLOW_DROP_OLDEST)
+        for i in range(4):
+            await queue.put("text", i, key="a")
+        assert await drain(queue) == [("text", 2), ("text", 3)]
+        assert queue.dropped == 2
+
+    asyncio.run(main())
+
+
+def test_drop_oldest_never_drops_ping():
+    async def main():
+        queue = MessageQueue(2, WS_OVERFLOW_DROP_OLDEST)
+        ping = {"ping": 1606780800000}
+        await queue.put("text", ping)
+        await queue.put("text", "d1", key="market.BTC-USD.depth.step6")
+        await queue.put("text", "d2", key="market.BTC-USD.depth.step6")
+        assert await drain(queue) == [("text", ping), ("text", "d2")]
+        assert queue.dropped == 1
+
+        # The queue is full of messages can not be dropped, wait for the consumer.
+        await queue.put("text", ping)
+        await queue.put("text", "trade")
+        task = asyncio.ensure_future(queue.put("text", {"ping": 1606780805000}))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        assert await queue.get() == ("text", ping)
+        await task
+        assert await drain(queue) == [("text", "trade"), ("text", {"ping": 1606780805000})]
+        assert queue.dropped == 1
+
+    asyncio.run(main())
+
+
+def test_block():
+    async def main():
+        queue = MessageQueue(1, WS_OVERFLOW_BLOCK)
+        await queue.put("text", 1)
+        task = asyncio.ensure_future(queue.put("text", 2))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        assert await queue.get() == ("text", 1)
+        await task
+        assert await queue.get() == ("text", 2)
+        assert queue.dropped == 0
+
+    asyncio.run(main())
+
+
+def test_conflate():
+    async def main():
+        queue = MessageQueue(10, WS_OVERFLOW_CONFLATE)
+        await queue.put("text", "a1", key="a")
+        await queue.put("text", "t1")
+        await queue.put("text", "a2", key="a")
+        await queue.put("text", "t2")
+        assert await drain(queue) == [("text", "a2"), ("text", "t1"), ("text", "t2")]
+        assert queue.conflated == 1
+
+    asyncio.run(main())
+
+
+def test_conflate_never_drops_unkeyed():
+    async def main():
+        queue = MessageQueue(2, WS_OVERFLOW_CONFLATE)
+        await queue.put("text", "t1")
+        await queue.put("text", "a1", key="a")
+        await queue.put("text", "t2")
+        assert await drain(queue) == [("text", "t1"), ("text", "t2")]
+        assert queue.dropped == 1
+
+        await queue.put("text", "t3")
+        await queue.put("text", "t4")
+        task = asyncio.ensure_future(queue.put("text", "t5"))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        assert await queue.get() == ("text", "t3")
+        await task
+        assert await drain(queue) == [("text", "t4"), ("text", "t5")]
+        assert queue.dropped == 1
+
+    asyncio.run(main())
+
+
+def test_market_conflate_key():
+    market = object.__new__(HuobiSwapMarket)
+    assert market.conflate_key("text", {"ch": "market.BTC-USD.depth.step6"}) == "market.BTC-USD.depth.step6"
+    assert market.conflate_key("text", {"ch": "market.BTC-USD.detail"}) == "market.BTC-USD.detail"
+    assert market.conflate_key("text", {"ch": "market.BTC-USD.trade.detail"}) is None
+    assert market.conflate_key("text", {"ch": "market.BTC-USD.depth.size_150.high_freq"}) is None
+    assert market.conflate_key("text", {"ping": 1}) is None